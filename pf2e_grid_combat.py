@@ -8,9 +8,16 @@ import sys
 import random
 import os
 import math
+import itertools
 import logging
+from collections import deque, namedtuple
+from functools import partial
+from enum import IntEnum
 from typing import List, Tuple, Dict, Optional, Union
 
+# Enables extra consistency checks (e.g. overlapping characters after AI moves)
+DEBUG = False
+
 # Initialize Pygame
 pygame.init()
 pygame.font.init()
@@ -40,6 +47,30 @@ WINDOW_HEIGHT = (GRID_ROWS * GRID_SIZE) + 100  # Add 100 for UI elements
 # Add near the top, after GRID_SIZE and before colors
 GRID_TOP = 50  # Space at the top for turn indicator, etc.
 
+# The on-grid cells around each cell, so adjacency queries skip bounds checks
+_ADJACENT_CELLS = {
+    (x, y): tuple((x + dx, y + dy)
+                  for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                  if (dx or dy) and 0 <= x + dx < GRID_COLS and 0 <= y + dy < GRID_ROWS)
+    for x in range(GRID_COLS) for y in range(GRID_ROWS)
+}
+
+# The enemy waves in order. Each enemy is (name, hp, ac, attack_bonus, damage_dice), starting on the
+# square at the same index in positions; preview is how the wave is named before it starts.
+WaveSpec = namedtuple('WaveSpec', 'announcement preview enemies positions')
+WAVES = (
+    WaveSpec("Wave 1: Goblins", "Goblins (Wave 1)",
+             (("Goblin", 20, 15, 5, (1, 8)),) * 3,
+             ((GRID_COLS - 4, 1), (GRID_COLS - 2, 1), (GRID_COLS - 1, 2))),
+    WaveSpec("Wave 2: Ogres' Fury", "Ogres (Wave 2)",
+             (("Ogre", 40, 17, 7, (2, 6)),) * 2,
+             ((GRID_COLS - 3, 1), (GRID_COLS - 1, 1))),
+    WaveSpec("Wave 3: Wyvern Assault!", "Wyvern Assault (Wave 3 Boss)",
+             (("Wyvern", 55, 19, 9, (2, 8)),) * 2,
+             ((GRID_COLS - 3, 1), (GRID_COLS - 1, 2))),
+)
+NUM_WAVES = len(WAVES)
+
 # Colors
 BACKGROUND_COLOR = (40, 40, 40)
 GRID_COLOR = (60, 60, 60)
@@ -85,7 +116,12 @@ ANIMATIONS = {
     'buff': {'color': SANCTUARY_COLOR, 'duration': EFFECT_DURATION}
 }
 
+# Game states whose screens are static and can use partial display updates
+STATIC_UI_STATES = {"intro", "upgrade", "wave_confirmation", "victory", "game_over"}
+
 # UI Constants
+MESSAGE_LOG_HEIGHT = 220
+MESSAGE_LOG_LIMIT = 100  # Oldest messages are dropped beyond this many
 BUTTON_HEIGHT = 50
 BUTTON_MARGIN = 15
 FONT_SIZE = 20
@@ -105,6 +141,143 @@ IMAGE_PATHS = {
     'blue_square': 'images/blue_square.png'
 }
 
+# Sprite paths looked up once, for the character constructors
+_FIGHTER_SPRITE = IMAGE_PATHS['fighter']
+_ROGUE_SPRITE = IMAGE_PATHS['rogue']
+_WIZARD_SPRITE = IMAGE_PATHS['wizard']
+_CLERIC_SPRITE = IMAGE_PATHS['cleric']
+_GOBLIN_SPRITE = IMAGE_PATHS['goblin']
+_OGRE_SPRITE = IMAGE_PATHS['ogre']
+_WYVERN_SPRITE = IMAGE_PATHS['wyvern']
+_BLUE_SQUARE_SPRITE = IMAGE_PATHS['blue_square']
+
+# Loaded sprites keyed by (path, size), so every Goblin shares one scaled surface
+_SPRITE_CACHE: Dict[Tuple[str, int], pygame.Surface] = {}
+
+def load_scaled_sprite(sprite_path: str) -> Optional[pygame.Surface]:
+    """Grid-sized sprite for sprite_path, loaded on first use; None if the file is missing"""
+    key = (sprite_path, GRID_SIZE)
+    sprite = _SPRITE_CACHE.get(key)
+    if sprite is None and os.path.exists(sprite_path):
+        original_sprite = pygame.image.load(sprite_path).convert_alpha()
+        sprite = _SPRITE_CACHE[key] = pygame.transform.scale(original_sprite, (GRID_SIZE, GRID_SIZE))
+    return sprite
+
+def preload_sprites():
+    """Load every sprite in IMAGE_PATHS up front, so spawning a wave never touches the disk"""
+    for sprite_path in IMAGE_PATHS.values():
+        try:
+            load_scaled_sprite(sprite_path)
+        except Exception as e:
+            logging.error(f"Error loading sprite {sprite_path}: {e}")
+
+# Pulsing outlines drawn around characters; only their alpha changes from frame to frame
+_TURN_HIGHLIGHT_SURFACE = pygame.Surface((GRID_SIZE + 8, GRID_SIZE + 8), pygame.SRCALPHA)
+pygame.draw.rect(_TURN_HIGHLIGHT_SURFACE, (255, 255, 255, 255),
+                 (0, 0, GRID_SIZE + 8, GRID_SIZE + 8), 4, border_radius=4)
+_SANCTUARY_SURFACE = pygame.Surface((GRID_SIZE + 12, GRID_SIZE + 12), pygame.SRCALPHA)
+pygame.draw.rect(_SANCTUARY_SURFACE, (255, 215, 0, 255),  # Golden color
+                 (0, 0, GRID_SIZE + 12, GRID_SIZE + 12), 6, border_radius=8)
+
+# Filled alpha circles used by particle trails, keyed by (color, radius, alpha)
+_PARTICLE_CACHE: Dict[Tuple[Tuple[int, int, int], int, int], pygame.Surface] = {}
+
+def particle_surface(color: Tuple[int, int, int], radius: int, alpha: int) -> pygame.Surface:
+    """Circle of the given color, radius and alpha, built on first use"""
+    key = (color, radius, alpha)
+    particle = _PARTICLE_CACHE.get(key)
+    if particle is None:
+        # Only built during play, once the display exists, so it can be converted before caching
+        particle = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.circle(particle, (*color, alpha), (radius, radius), radius)
+        _PARTICLE_CACHE[key] = particle
+    return particle
+
+# Unit circle sampled once per degree, for the arcs drawn by shield and sanctuary effects
+_COS = [math.cos(math.radians(a)) for a in range(360)]
+_SIN = [math.sin(math.radians(a)) for a in range(360)]
+
+# Directions of the twelve rays drawn by a critical hit
+_CRITICAL_RAYS = [(math.cos((i / 12) * math.pi * 2), math.sin((i / 12) * math.pi * 2)) for i in range(12)]
+
+# (r, g, b, a) tuples for every alpha of an effect color, so draw calls index instead of unpacking
+_RGBA_TABLES: Dict[Tuple[int, int, int], Tuple[Tuple[int, int, int, int], ...]] = {}
+
+def rgba_table(color: Tuple[int, int, int]) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Table mapping alpha 0-255 to (*color, alpha), built on first use"""
+    table = _RGBA_TABLES.get(color)
+    if table is None:
+        table = _RGBA_TABLES[color] = tuple((*color, alpha) for alpha in range(256))
+    return table
+
+# Grid lines, drawn with some transparency so the background shows through
+_GRID_LINES_SURFACE = pygame.Surface((GRID_COLS * GRID_SIZE, GRID_ROWS * GRID_SIZE), pygame.SRCALPHA)
+for _x in range(GRID_COLS + 1):
+    pygame.draw.line(_GRID_LINES_SURFACE, (80, 80, 80, 128),  # Semi-transparent gray
+                     (_x * GRID_SIZE, 0), (_x * GRID_SIZE, GRID_ROWS * GRID_SIZE))
+for _y in range(GRID_ROWS + 1):
+    pygame.draw.line(_GRID_LINES_SURFACE, (80, 80, 80, 128),
+                     (0, _y * GRID_SIZE), (GRID_COLS * GRID_SIZE, _y * GRID_SIZE))
+# Semi-transparent fill for each square the selected character can move to
+_MOVE_HIGHLIGHT_SURFACE = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
+_MOVE_HIGHLIGHT_SURFACE.fill((120, 120, 120, 100))
+
+def convert_cached_surfaces():
+    """Convert the overlay surfaces built at import to the display's pixel format, so blitting them needs no conversion"""
+    global _TURN_HIGHLIGHT_SURFACE, _SANCTUARY_SURFACE, _MOVE_HIGHLIGHT_SURFACE
+    _TURN_HIGHLIGHT_SURFACE = _TURN_HIGHLIGHT_SURFACE.convert_alpha()
+    _SANCTUARY_SURFACE = _SANCTUARY_SURFACE.convert_alpha()
+    _MOVE_HIGHLIGHT_SURFACE = _MOVE_HIGHLIGHT_SURFACE.convert_alpha()
+# One Rect per grid square, indexed [x][y], for outlining squares without building a Rect each frame
+_CELL_RECTS = [[pygame.Rect(_x * GRID_SIZE, _y * GRID_SIZE, GRID_SIZE, GRID_SIZE) for _y in range(GRID_ROWS)]
+               for _x in range(GRID_COLS)]
+
+def roll_dice(count: int, sides: int) -> List[int]:
+    """Roll count dice with the given number of sides and return each result"""
+    return random.choices(range(1, sides + 1), k=count)
+
+class ActionID(IntEnum):
+    """Identifies an action that needs a target, so dispatch never compares names"""
+    STRIKE = 1
+    POWER_ATTACK = 2
+    TWIN_FEINT = 3
+    ARCANE_BLAST = 4
+    MAGIC_MISSILE = 5
+    SPIRIT_LINK = 6
+    SANCTUARY = 7
+    HEAL_TOUCH = 8
+    HEAL_RANGED = 9
+    HEAL_BURST = 10
+
+    @property
+    def label(self) -> str:
+        """Name shown to the player"""
+        return ACTION_LABELS[self]
+
+ACTION_LABELS = {
+    ActionID.STRIKE: "Strike",
+    ActionID.POWER_ATTACK: "Power Attack",
+    ActionID.TWIN_FEINT: "Twin Feint",
+    ActionID.ARCANE_BLAST: "Arcane Blast",
+    ActionID.MAGIC_MISSILE: "Magic Missile",
+    ActionID.SPIRIT_LINK: "Spirit Link",
+    ActionID.SANCTUARY: "Sanctuary",
+    ActionID.HEAL_TOUCH: "Heal",
+    ActionID.HEAL_RANGED: "Heal",
+    ActionID.HEAL_BURST: "Heal",
+}
+
+# One action button of a player class, see Character.ACTION_SPEC.
+#   label: button text
+#   cost: actions needed to show the button
+#   method: name of the Character method the button calls
+#   action_id: ActionID for actions that need a target, None for actions on the character itself
+#   reach: furthest the selected target may be, in squares; None for any distance
+#   kwargs: extra keyword arguments for method, or None
+#   unless: attribute that hides the button while it is true (e.g. a shield that is already up)
+ActionSpec = namedtuple('ActionSpec', 'label cost method action_id reach kwargs unless',
+                        defaults=(None, None, None, None))
+
 class Effect:
     """
     Handles visual effects and animations in the game.
@@ -127,21 +300,33 @@ class Effect:
                  effect_type: str = "basic",
                  damage: Optional[int] = None,
                  hit_type: Optional[str] = None):
+        self.reset(start_pos, end_pos, color, duration, effect_type, damage, hit_type)
+    
+    def reset(self, start_pos: Union['GridPosition', Tuple[int, int]], 
+              end_pos: Union['GridPosition', Tuple[int, int]], 
+              color: Tuple[int, int, int], 
+              duration: int = EFFECT_DURATION, 
+              effect_type: str = "basic",
+              damage: Optional[int] = None,
+              hit_type: Optional[str] = None):
+        """(Re)initialize the effect, so finished effects can be reused from Game's pool"""
         # Convert grid positions to pixel coordinates
         if isinstance(start_pos, GridPosition):
-            self.start_pos = (start_pos.x * GRID_SIZE, start_pos.y * GRID_SIZE)
+            self.start_pos = start_pos.get_pixel_pos()
         else:
             self.start_pos = start_pos
             
         if isinstance(end_pos, GridPosition):
-            self.end_pos = (end_pos.x * GRID_SIZE, end_pos.y * GRID_SIZE)
+            self.end_pos = end_pos.get_pixel_pos()
         else:
             self.end_pos = end_pos
             
         self.color = color
+        self._rgba = rgba_table(color)
         self.duration = duration
         self.current_frame = -EFFECT_DELAY  # Start with negative frames for delay
         self.effect_type = effect_type
+        self._draw_effect = Effect._DRAW_METHODS.get(effect_type)  # None for "basic" and unknown types
         self.damage = damage
         self.hit_type = hit_type
         
@@ -149,11 +334,6 @@ class Effect:
         self.dx = self.end_pos[0] - self.start_pos[0]
         self.dy = self.end_pos[1] - self.start_pos[1]
         
-    def update(self) -> bool:
-        """Update effect animation. Returns True if effect is still active."""
-        self.current_frame += 1
-        return self.current_frame < self.duration
-        
     def draw(self, surface: pygame.Surface):
         """
         Draw the current state of the animation on the given surface.
@@ -167,26 +347,8 @@ class Effect:
         progress = self.current_frame / self.duration
         
         # Draw the main effect animation
-        if self.effect_type == "magic_missile":
-            self._draw_magic_missile(surface, progress)
-        elif self.effect_type == "heal":
-            self._draw_heal(surface, progress)
-        elif self.effect_type == "shield":
-            self._draw_shield(surface, progress)
-        elif self.effect_type == "strike":
-            self._draw_strike(surface, progress)
-        elif self.effect_type == "power_attack":
-            self._draw_power_attack(surface, progress)
-        elif self.effect_type == "sneak_attack":
-            self._draw_sneak_attack(surface, progress)
-        elif self.effect_type == "critical":
-            self._draw_critical(surface, progress)
-        elif self.effect_type == "miss":
-            self._draw_miss(surface, progress)
-        elif self.effect_type == "link":
-            self._draw_link(surface, progress)
-        elif self.effect_type == "buff":
-            self._draw_buff(surface, progress)
+        if self._draw_effect is not None:
+            self._draw_effect(self, surface, progress)
             
         # Draw damage numbers and hit/miss overlay
         if self.damage is not None or self.hit_type is not None:
@@ -273,15 +435,24 @@ class Effect:
             
             # Draw outer glow
             glow_size = size * 2
-            glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*self.color, alpha // 3), (glow_size, glow_size), glow_size)
-            surface.blit(glow_surface, (trail_x - glow_size + GRID_SIZE//2, trail_y - glow_size + GRID_SIZE//2))
+            surface.blit(particle_surface(self.color, glow_size, alpha // 3),
+                         (trail_x - glow_size + GRID_SIZE//2, trail_y - glow_size + GRID_SIZE//2))
             
             # Draw core particle
-            particle_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, (*self.color, alpha), (size, size), size)
-            surface.blit(particle_surface, (trail_x - size + GRID_SIZE//2, trail_y - size + GRID_SIZE//2))
-            
+            surface.blit(particle_surface(self.color, size, alpha),
+                         (trail_x - size + GRID_SIZE//2, trail_y - size + GRID_SIZE//2))
+            
+    @staticmethod
+    def _path_surface(start_x: int, start_y: int, end_x: int, end_y: int,
+                      margin: int) -> Tuple[pygame.Surface, int, int]:
+        """Transparent surface covering the path between two points plus margin on every side,
+        returned with its top-left corner in the caller's coordinates"""
+        left = min(start_x, end_x) - margin
+        top = min(start_y, end_y) - margin
+        width = max(start_x, end_x) + margin - left
+        height = max(start_y, end_y) + margin - top
+        return pygame.Surface((width, height), pygame.SRCALPHA), left, top
+
     def _draw_strike(self, surface, progress):
         """Draw a basic strike animation"""
         start_x = self.start_pos[0] + GRID_SIZE//2
@@ -289,8 +460,12 @@ class Effect:
         end_x = self.end_pos[0] + GRID_SIZE//2
         end_y = self.end_pos[1] + GRID_SIZE//2
         
-        # Create slash trail
-        slash_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        # Create slash trail, just big enough for slashes anywhere along the path
+        slash_surface, left, top = self._path_surface(start_x, start_y, end_x, end_y, 40)
+        start_x -= left
+        end_x -= left
+        start_y -= top
+        end_y -= top
         alpha = int(255 * (1 - progress))
         
         # Draw multiple slash lines with varying angles
@@ -302,11 +477,11 @@ class Effect:
                 
                 # Add vertical variation for slash effect
                 offset = math.sin(p * math.pi) * 30
-                pygame.draw.line(slash_surface, (*self.color, alpha),
+                pygame.draw.line(slash_surface, self._rgba[alpha],
                                (current_x - 25, current_y + offset),
                                (current_x + 25, current_y - offset), 4)
         
-        surface.blit(slash_surface, (0, 50))  # Offset by 50 to account for turn indicator
+        surface.blit(slash_surface, (left, top + 50))  # Offset by 50 to account for turn indicator
         
     def _draw_power_attack(self, surface, progress):
         """Draw a power attack animation with multiple heavy strikes"""
@@ -315,8 +490,12 @@ class Effect:
         end_x = self.end_pos[0] + GRID_SIZE//2
         end_y = self.end_pos[1] + GRID_SIZE//2
         
-        # Create effect surface
-        effect_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        # Create effect surface covering the slashes and the impact burst at the end
+        effect_surface, left, top = self._path_surface(start_x, start_y, end_x, end_y, max(45, GRID_SIZE + 3))
+        start_x -= left
+        end_x -= left
+        start_y -= top
+        end_y -= top
         alpha = int(255 * (1 - progress))
         
         # Draw multiple powerful slashes
@@ -331,17 +510,17 @@ class Effect:
                 width = 6  # Thicker lines
                 
                 # Draw main slash
-                pygame.draw.line(effect_surface, (*self.color, alpha),
+                pygame.draw.line(effect_surface, self._rgba[alpha],
                                (current_x - 35, current_y + offset),
                                (current_x + 35, current_y - offset), width)
                 
                 # Draw impact burst at the end
                 if p > 0.8:
                     burst_radius = (p - 0.8) * 5 * GRID_SIZE
-                    pygame.draw.circle(effect_surface, (*self.color, alpha//2),
+                    pygame.draw.circle(effect_surface, self._rgba[alpha//2],
                                      (end_x, end_y), burst_radius, 3)
         
-        surface.blit(effect_surface, (0, 50))
+        surface.blit(effect_surface, (left, top + 50))
         
     def _draw_sneak_attack(self, surface, progress):
         """Draw a sneak attack animation with quick, precise strikes"""
@@ -352,31 +531,38 @@ class Effect:
         effect_surface = pygame.Surface((GRID_SIZE * 3, GRID_SIZE * 3), pygame.SRCALPHA)
         alpha = int(255 * (1 - progress))
         
-        # Draw multiple quick strikes from different angles
+        # Everything except the angle is the same for all eight strikes
+        color = self._rgba[alpha]
+        middle = GRID_SIZE * 1.5
+        distance = GRID_SIZE * (0.5 + math.sin(progress * math.pi * 3) * 0.5)
+        line_progress = max(0, min(1, progress * 3 - 0.5))
+        size = max(2, 6 * (1 - progress))
+        
+        # Draw multiple quick strikes from different angles; lock once for the whole batch
+        # instead of letting every draw call lock and unlock the surface
+        effect_surface.lock()
         for i in range(8):
             angle = (i / 8) * math.pi * 2 + progress * math.pi * 6
-            distance = GRID_SIZE * (0.5 + math.sin(progress * math.pi * 3) * 0.5)
+            cos_a = math.cos(angle)
+            sin_a = math.sin(angle)
             
-            x = GRID_SIZE * 1.5 + math.cos(angle) * distance
-            y = GRID_SIZE * 1.5 + math.sin(angle) * distance
+            x = middle + cos_a * distance
+            y = middle + sin_a * distance
             
             # Draw strike lines
-            line_progress = max(0, min(1, progress * 3 - 0.5))
             if line_progress > 0:
-                line_x = GRID_SIZE * 1.5 + math.cos(angle) * distance * line_progress
-                line_y = GRID_SIZE * 1.5 + math.sin(angle) * distance * line_progress
-                pygame.draw.line(effect_surface, (*self.color, alpha),
-                               (GRID_SIZE * 1.5, GRID_SIZE * 1.5),
-                               (line_x, line_y), 2)
+                line_x = middle + cos_a * distance * line_progress
+                line_y = middle + sin_a * distance * line_progress
+                pygame.draw.line(effect_surface, color, (middle, middle), (line_x, line_y), 2)
             
             # Draw sparkle effects
-            size = max(2, 6 * (1 - progress))
-            pygame.draw.circle(effect_surface, (*self.color, alpha), (x, y), size)
+            pygame.draw.circle(effect_surface, color, (x, y), size)
         
         # Add a subtle glow effect
         glow_radius = GRID_SIZE * (0.5 + math.sin(progress * math.pi) * 0.3)
-        pygame.draw.circle(effect_surface, (*self.color, alpha//3),
+        pygame.draw.circle(effect_surface, self._rgba[alpha//3],
                          (GRID_SIZE * 1.5, GRID_SIZE * 1.5), glow_radius)
+        effect_surface.unlock()
         
         surface.blit(effect_surface, (center_x - GRID_SIZE * 1.5, center_y - GRID_SIZE * 1.5 + 50))
         
@@ -389,20 +575,22 @@ class Effect:
         effect_surface = pygame.Surface((GRID_SIZE * 4, GRID_SIZE * 4), pygame.SRCALPHA)
         alpha = int(255 * (1 - progress))
         
-        # Draw expanding burst
+        # Draw expanding burst (surface locked once for all thirteen draw calls)
         burst_radius = GRID_SIZE * 2 * progress
-        pygame.draw.circle(effect_surface, (*self.color, alpha//2),
+        effect_surface.lock()
+        pygame.draw.circle(effect_surface, self._rgba[alpha//2],
                          (GRID_SIZE * 2, GRID_SIZE * 2), burst_radius, 4)
         
         # Draw radiating lines
-        for i in range(12):
-            angle = (i / 12) * math.pi * 2
-            length = burst_radius * 1.2
-            end_x = GRID_SIZE * 2 + math.cos(angle) * length
-            end_y = GRID_SIZE * 2 + math.sin(angle) * length
-            pygame.draw.line(effect_surface, (*self.color, alpha),
+        color = self._rgba[alpha]
+        length = burst_radius * 1.2
+        for cos_a, sin_a in _CRITICAL_RAYS:
+            end_x = GRID_SIZE * 2 + cos_a * length
+            end_y = GRID_SIZE * 2 + sin_a * length
+            pygame.draw.line(effect_surface, color,
                            (GRID_SIZE * 2, GRID_SIZE * 2),
                            (end_x, end_y), 3)
+        effect_surface.unlock()
         
         surface.blit(effect_surface, (center_x - GRID_SIZE * 2, center_y - GRID_SIZE * 2 + 50))
         
@@ -420,7 +608,7 @@ class Effect:
             p = progress + i * 0.2
             if p < 1:
                 offset = math.sin(p * math.pi) * GRID_SIZE * 0.3
-                pygame.draw.line(effect_surface, (*self.color, alpha),
+                pygame.draw.line(effect_surface, self._rgba[alpha],
                                (GRID_SIZE - 20, GRID_SIZE + offset),
                                (GRID_SIZE + 20, GRID_SIZE - offset), 2)
         
@@ -441,7 +629,7 @@ class Effect:
             3,
             progress * math.pi * 4,
             math.pi / 2,
-            (*self.color, alpha)
+            self._rgba[alpha]
         )
         
         surface.blit(shield_surface, (center_x - GRID_SIZE, center_y - GRID_SIZE))
@@ -456,7 +644,7 @@ class Effect:
         # Draw expanding healing circle
         circle_surface = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
         alpha = int(255 * (1 - progress))
-        pygame.draw.circle(circle_surface, (*self.color, alpha), (GRID_SIZE, GRID_SIZE), radius, 3)
+        pygame.draw.circle(circle_surface, self._rgba[alpha], (GRID_SIZE, GRID_SIZE), radius, 3)
         
         # Draw healing crosses
         for i in range(4):
@@ -483,7 +671,7 @@ class Effect:
         alpha = int(150 + 105 * pulse * (1 - progress))
         
         # Draw the main connecting line
-        line_color = (*self.color, alpha)
+        line_color = self._rgba[alpha]
         line_width = max(1, int(6 * (1 - progress * 0.5)))
         
         # Create a surface for the line with alpha
@@ -508,7 +696,7 @@ class Effect:
             particle_alpha = int(200 * (1 - progress))
             
             if particle_alpha > 0:
-                pygame.draw.circle(surface, (*self.color, particle_alpha), 
+                pygame.draw.circle(surface, self._rgba[particle_alpha], 
                                  (int(particle_x), int(particle_y)), 3)
         
         # Position the line surface correctly
@@ -531,7 +719,7 @@ class Effect:
             4,
             0,
             math.pi / 2,
-            (*self.color, alpha)
+            self._rgba[alpha]
         )
         
         surface.blit(effect_surface, (center_x - GRID_SIZE * 2, center_y - GRID_SIZE * 2))
@@ -551,17 +739,32 @@ class Effect:
             color: (r, g, b, a) color tuple
             line_width: Width of the arc lines
         """
+        cx, cy = center
+        surface.lock()
         for i in range(num_arcs):
             start_angle = angle_offset + (i * math.pi * 2 / num_arcs)
             end_angle = start_angle + arc_length
             
-            points = [(
-                center[0] + math.cos(a * math.pi / 180) * radius,
-                center[1] + math.sin(a * math.pi / 180) * radius
-            ) for a in range(int(start_angle * 180/math.pi), int(end_angle * 180/math.pi))]
+            points = [(cx + _COS[a % 360] * radius, cy + _SIN[a % 360] * radius)
+                      for a in range(int(start_angle * 180/math.pi), int(end_angle * 180/math.pi))]
             
             if len(points) > 1:
                 pygame.draw.lines(surface, color, False, points, line_width)
+        surface.unlock()
+
+    # Draw method for each effect_type, resolved once when the effect is (re)initialized
+    _DRAW_METHODS = {
+        "magic_missile": _draw_magic_missile,
+        "heal": _draw_heal,
+        "shield": _draw_shield,
+        "strike": _draw_strike,
+        "power_attack": _draw_power_attack,
+        "sneak_attack": _draw_sneak_attack,
+        "critical": _draw_critical,
+        "miss": _draw_miss,
+        "link": _draw_link,
+        "buff": _draw_buff,
+    }
 
 class GridPosition:
     """
@@ -573,22 +776,42 @@ class GridPosition:
         x: X coordinate on the grid
         y: Y coordinate on the grid
     """
+    # Many short-lived positions are created while enumerating moves, so skip the per-instance dict.
+    # Positions are never mutated (moving assigns a new GridPosition), so the pixel coordinates
+    # are worked out once up front.
+    __slots__ = ('x', 'y', '_pixel')
+    
     def __init__(self, x: int, y: int):
         self.x = x
         self.y = y
+        self._pixel = (x * GRID_SIZE, y * GRID_SIZE)
     
     def __eq__(self, other):
         if not isinstance(other, GridPosition):
             return False
         return self.x == other.x and self.y == other.y
     
+    def __hash__(self):
+        return hash((self.x, self.y))
+    
     def distance_to(self, other: 'GridPosition') -> int:
-        """Calculate grid distance (in squares) to another position"""
-        return max(abs(self.x - other.x), abs(self.y - other.y))
+        """Calculate grid distance (in squares) to another position, counting a diagonal step as one square"""
+        # Plain comparisons instead of max()/abs(), which cost a global lookup and a call each
+        dx = self.x - other.x
+        if dx < 0:
+            dx = -dx
+        dy = self.y - other.y
+        if dy < 0:
+            dy = -dy
+        return dx if dx > dy else dy
     
     def get_pixel_pos(self) -> Tuple[int, int]:
         """Convert grid position to pixel coordinates"""
-        return (self.x * GRID_SIZE, self.y * GRID_SIZE)
+        return self._pixel
+    
+    def get_rect(self) -> pygame.Rect:
+        """Rect covering this square in grid-surface pixels (shared, so don't modify it)"""
+        return _CELL_RECTS[self.x][self.y]
 
 class Character:
     """
@@ -605,6 +828,10 @@ class Character:
         potions: Number of healing potions available
         speed: Movement speed in feet
     """
+    # Class-specific buttons, shown in this order after Stride and the potion
+    ACTION_SPEC: Tuple[ActionSpec, ...] = ()
+    POTION_LABEL = "Heal [1]"
+    
     def __init__(self, name: str, hp: int, ac: int, attack_bonus: int):
         self._name = name
         self._max_hp = hp
@@ -622,6 +849,8 @@ class Character:
         self._is_enemy = False  # Flag to distinguish enemies from party members
         self._conditions = {}  # Dictionary to store active conditions and their durations
         self._sanctuary_active = False  # Special flag for sanctuary protection
+        self._actions_cache_key = None  # State the cached action list was built for
+        self._actions_cache = []
 
 
     @property
@@ -750,17 +979,17 @@ class Character:
     def load_sprite(self, sprite_path: str):
         """Load and scale character sprite"""
         try:
-            if os.path.exists(sprite_path):
+            sprite = load_scaled_sprite(sprite_path)
+            if sprite is not None:
                 self.sprite_path = sprite_path
-                original_sprite = pygame.image.load(sprite_path).convert_alpha()
-                self.sprite = pygame.transform.scale(original_sprite, (GRID_SIZE, GRID_SIZE))
+                self.sprite = sprite
         except Exception as e:
             logging.error(f"Error loading sprite {sprite_path}: {e}")
             self.sprite = None
     
     def is_alive(self) -> bool:
         """Check if the character is still alive."""
-        return self.hp > 0
+        return self._hp > 0
     
     def get_ac(self) -> int:
         """
@@ -775,9 +1004,9 @@ class Character:
             return False
         
         # Check if position is occupied by a living character
-        for char in game.get_all_characters():
-            if char != self and char.position == new_pos and char.is_alive():
-                return False
+        occupant = game.get_occupancy().get((new_pos.x, new_pos.y))
+        if occupant is not None and occupant is not self:
+            return False
         
         # Calculate movement cost (diagonal movement costs more)
         distance = self.position.distance_to(new_pos)
@@ -786,28 +1015,81 @@ class Character:
         return movement_cost <= self.speed
     
     def get_valid_moves(self, game: 'Game') -> List[GridPosition]:
-        """Get all valid movement positions"""
-        valid_moves = []
+        """
+        Get all valid movement positions.
+        The list is shared through game.move_cache until someone moves, so don't modify it.
+        """
+        key = (self, self.position)
+        moves = game.move_cache.get(key)
+        if moves is not None:
+            return moves
         max_squares = self.speed // 5
-        
-        for x in range(max(0, self.position.x - max_squares), 
-                      min(GRID_COLS, self.position.x + max_squares + 1)):
-            for y in range(max(0, self.position.y - max_squares),
-                         min(GRID_ROWS, self.position.y + max_squares + 1)):
-                pos = GridPosition(x, y)
-                if self.can_move_to(pos, game):
-                    valid_moves.append(pos)
-        
-        return valid_moves
+        x, y = self.position.x, self.position.y
+        xs = range(max(0, x - max_squares), min(GRID_COLS, x + max_squares + 1))
+        ys = range(max(0, y - max_squares), min(GRID_ROWS, y + max_squares + 1))
+        
+        # Look up occupied squares once instead of scanning every character per square.
+        # Every square in the bounding box is within movement range (distance is Chebyshev).
+        occupied = game.get_occupancy()
+        moves = game.move_cache[key] = [GridPosition(mx, my) for mx in xs for my in ys
+                                        if occupied.get((mx, my), self) is self]
+        return moves
+    
+    def nearest(self, chars) -> Tuple[Optional['Character'], int]:
+        """Closest living character in chars and its distance, or (None, 0) if there is none"""
+        px, py = self._position.x, self._position.y
+        # Start above any distance on the grid so the loop needs no "nothing found yet" test
+        best, best_distance = None, GRID_COLS + GRID_ROWS
+        # Read the backing fields directly: this runs for every AI decision
+        for char in chars:
+            if char._hp <= 0:
+                continue
+            pos = char._position
+            distance = max(abs(pos.x - px), abs(pos.y - py))
+            if distance < best_distance:
+                best, best_distance = char, distance
+                if distance <= 1:  # Two living characters never share a square, so adjacent is the closest possible
+                    break
+        if best is None:
+            return None, 0
+        return best, best_distance
     
     def move_to(self, new_pos: GridPosition, game: 'Game') -> bool:
         """Attempt to move character to new position"""
         if self.can_move_to(new_pos, game):
+            old_pos = self.position
             self.position = new_pos
+            game.character_moved(self, old_pos)
             return True
         else:
             return False
     
+    def plan_action(self, game: 'Game') -> bool:
+        """
+        Take one action on behalf of an AI-controlled party member.
+        Returns True if an action was performed, False to end the turn.
+        """
+        return False
+    
+    def _move_toward(self, game: 'Game', target_pos: GridPosition, preferred: Optional[set] = None) -> bool:
+        """
+        Spend one AI action moving to the reachable square closest to target_pos,
+        or to the closest one in preferred (a set of (x, y) squares) if any is reachable.
+        """
+        moves = self.get_valid_moves(game)
+        if not moves:
+            return False
+        # Sort the available positions by proximity to the target (same metric as distance_to, inlined)
+        tx, ty = target_pos.x, target_pos.y
+        moves = sorted(moves, key=lambda p: max(abs(p.x - tx), abs(p.y - ty)))
+        best_move = moves[0]
+        if preferred:
+            best_move = next((move for move in moves if (move.x, move.y) in preferred), best_move)
+        if not self.move_to(best_move, game):
+            return False
+        game.ai_actions_remaining -= 1
+        return True
+    
     def draw(self, surface: pygame.Surface, game: Optional['Game'] = None):
         """
         Render the character onto the game surface, including visual effects
@@ -819,17 +1101,13 @@ class Character:
         """
         if not self.alive:
             return
-        x = self.position.x * GRID_SIZE
-        y = self.position.y * GRID_SIZE  # Remove GRID_TOP - it's added when grid_surface is blitted
+        x, y = self.position.get_pixel_pos()  # Remove GRID_TOP - it's added when grid_surface is blitted
         
         # Draw sanctuary protection indicator
         if self.sanctuary_active:
             pulse = abs(math.sin(pygame.time.get_ticks() / 300))  # Faster pulse for sanctuary
-            sanctuary_color = (255, 215, 0, int(80 + 100 * pulse))  # Golden color
-            sanctuary_surface = pygame.Surface((GRID_SIZE + 12, GRID_SIZE + 12), pygame.SRCALPHA)
-            pygame.draw.rect(sanctuary_surface, sanctuary_color, 
-                           (0, 0, GRID_SIZE + 12, GRID_SIZE + 12), 6, border_radius=8)
-            surface.blit(sanctuary_surface, (x - 6, y - 6))
+            _SANCTUARY_SURFACE.set_alpha(int(80 + 100 * pulse))
+            surface.blit(_SANCTUARY_SURFACE, (x - 6, y - 6))
         
         # Draw active turn indicator if this is the current character
         if (game and not self.is_enemy and 
@@ -837,11 +1115,8 @@ class Character:
             game.current_member_idx < len(game.party) and 
             game.party[game.current_member_idx] == self):
             pulse = abs(math.sin(pygame.time.get_ticks() / 500))
-            highlight_color = (255, 255, 255, int(100 + 155 * pulse))
-            highlight_surface = pygame.Surface((GRID_SIZE + 8, GRID_SIZE + 8), pygame.SRCALPHA)
-            pygame.draw.rect(highlight_surface, highlight_color, 
-                           (0, 0, GRID_SIZE + 8, GRID_SIZE + 8), 4, border_radius=4)
-            surface.blit(highlight_surface, (x - 4, y - 4))
+            _TURN_HIGHLIGHT_SURFACE.set_alpha(int(100 + 155 * pulse))
+            surface.blit(_TURN_HIGHLIGHT_SURFACE, (x - 4, y - 4))
         
         # Draw targeting indicator if this character is currently selected as a target
         if (game and game.selected_target == self):
@@ -868,9 +1143,8 @@ class Character:
         
         # Draw character sprite or fallback shape
         if self.sprite:
-            # Always scale sprite to fit grid square
-            sprite = pygame.transform.scale(self.sprite, (GRID_SIZE, GRID_SIZE))
-            surface.blit(sprite, (x, y))
+            # load_sprite already scaled the sprite to fit a grid square
+            surface.blit(self.sprite, (x, y))
         else:
             if self.is_enemy:
                 points = [
@@ -902,34 +1176,14 @@ class Character:
         if not target.is_alive():
             return False
             
-        # Get all allies (characters on the same side)
-        allies = [char for char in game.get_all_characters() 
-                 if char != self and char.is_alive() and 
-                 char.is_enemy == self.is_enemy]
-        
-        # Check if any ally is on the opposite side of the target
-        my_pos = self.position
-        target_pos = target.position
-        
-        for ally in allies:
-            ally_pos = ally.position
-            # Check if ally is also adjacent to target
-            if ally_pos.distance_to(target_pos) <= 1:
-                # Check if ally is on opposite side
-                # If we're on same row
-                if my_pos.y == target_pos.y == ally_pos.y:
-                    if (my_pos.x < target_pos.x < ally_pos.x) or (ally_pos.x < target_pos.x < my_pos.x):
-                        return True
-                # If we're on same column
-                elif my_pos.x == target_pos.x == ally_pos.x:
-                    if (my_pos.y < target_pos.y < ally_pos.y) or (ally_pos.y < target_pos.y < my_pos.y):
-                        return True
-                # If we're diagonal
-                elif abs(my_pos.x - ally_pos.x) == 2 and abs(my_pos.y - ally_pos.y) == 2:
-                    if target_pos.x == (my_pos.x + ally_pos.x) // 2 and target_pos.y == (my_pos.y + ally_pos.y) // 2:
-                        return True
-        
-        return False
+        # Flanking needs an ally on the square mirroring ours across the target,
+        # which only exists when we are adjacent to the target
+        dx = target.position.x - self.position.x
+        dy = target.position.y - self.position.y
+        if max(abs(dx), abs(dy)) != 1:
+            return False
+        ally = game.get_occupancy().get((target.position.x + dx, target.position.y + dy))
+        return ally is not None and ally is not self and ally.is_enemy == self.is_enemy
 
     def apply_upgrade(self, upgrade_type: str) -> str:
         """Apply an upgrade to the character"""
@@ -976,6 +1230,9 @@ class Character:
             game.add_message(f"{target.name} is out of range!")
             return 0, False
             
+        # Pixel positions for the effects below; neither character moves during an attack
+        src_px, dst_px = self.get_pixel_pos(), target.get_pixel_pos()
+        
         # Check for Sanctuary protection (only affects enemies attacking party members)
         if self.is_enemy and target.sanctuary_active:
             will_save = random.randint(1, 20) + 2  # Enemies have +2 Will save
@@ -989,8 +1246,8 @@ class Character:
                 target.remove_condition("Sanctuary")
                 game.add_message(f"{target.name}'s Sanctuary fades after protecting them.")
                 # Add a miss effect to show the failed attack attempt
-                game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), MISS_COLOR, 
-                                     effect_type="miss", hit_type="miss"))
+                game.spawn_effect(src_px, dst_px, MISS_COLOR, 
+                                  effect_type="miss", hit_type="miss")
                 return 1, False  # Action is used but attack fails
             else:
                 game.add_message(f"{self.name} overcomes the Sanctuary and attacks!")
@@ -1003,16 +1260,17 @@ class Character:
             target.off_guard = True
         
         roll = random.randint(1, 20)
-        total = roll + self.attack_bonus
+        attack_bonus = self.attack_bonus
+        total = roll + attack_bonus
         target_ac = target.get_ac()
         
-        game.add_message(f"{self.name} rolls to hit: d20({roll}) + {self.attack_bonus} = {total} vs AC {target_ac}")
+        game.add_message(f"{self.name} rolls to hit: d20({roll}) + {attack_bonus} = {total} vs AC {target_ac}")
         
         if roll == 1:
             game.add_message("Critical Miss!")
             # Add miss animation with overlay
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), MISS_COLOR, 
-                                 effect_type="miss", hit_type="miss"))
+            game.spawn_effect(src_px, dst_px, MISS_COLOR, 
+                              effect_type="miss", hit_type="miss")
             target.off_guard = False
             return 1, False
             
@@ -1021,30 +1279,30 @@ class Character:
         if roll == 20 or total >= target_ac + 10:
             game.add_message("Critical Hit!")
             # Roll damage dice and show individual rolls
-            damage_rolls = [random.randint(1, dice_sides) for _ in range(dice_num * 2)]
+            damage_rolls = roll_dice(dice_num * 2, dice_sides)
             dmg = sum(damage_rolls)
             # Show the dice rolls
             dice_str = " + ".join(str(roll) for roll in damage_rolls)
             game.add_message(f"Damage: {dice_num * 2}d{dice_sides} = [{dice_str}] = {dmg}")
             # Add critical hit animation with overlay and damage
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), CRITICAL_COLOR, 
-                                 effect_type="critical", damage=dmg, hit_type="critical"))
+            game.spawn_effect(src_px, dst_px, CRITICAL_COLOR, 
+                              effect_type="critical", damage=dmg, hit_type="critical")
         elif total >= target_ac:
             game.add_message("Hit!")
             # Roll damage dice and show individual rolls
-            damage_rolls = [random.randint(1, dice_sides) for _ in range(dice_num)]
+            damage_rolls = roll_dice(dice_num, dice_sides)
             dmg = sum(damage_rolls)
             # Show the dice rolls
             dice_str = " + ".join(str(roll) for roll in damage_rolls)
             game.add_message(f"Damage: {dice_num}d{dice_sides} = [{dice_str}] = {dmg}")
             # Add basic strike animation with overlay and damage
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), STRIKE_COLOR, 
-                                 effect_type="strike", damage=dmg, hit_type="hit"))
+            game.spawn_effect(src_px, dst_px, STRIKE_COLOR, 
+                              effect_type="strike", damage=dmg, hit_type="hit")
         else:
             game.add_message("Miss!")
             # Add miss animation with overlay
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), MISS_COLOR, 
-                                 effect_type="miss", hit_type="miss"))
+            game.spawn_effect(src_px, dst_px, MISS_COLOR, 
+                              effect_type="miss", hit_type="miss")
             target.off_guard = False
             return 1, False
             
@@ -1054,8 +1312,8 @@ class Character:
             dmg += sa_dmg
             game.add_message(f"Sneak Attack! Extra d6: [{sa_dmg}]")
             # Add sneak attack animation with damage
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), SNEAK_ATTACK_COLOR, 
-                                 effect_type="sneak_attack", damage=sa_dmg))
+            game.spawn_effect(src_px, dst_px, SNEAK_ATTACK_COLOR, 
+                              effect_type="sneak_attack", damage=sa_dmg)
             
         dmg += bonus_damage + self.bonus_damage
         game.add_message(f"Damage Total: {dmg}")
@@ -1077,13 +1335,15 @@ class Character:
         
         if not self.alive:
             game.add_message(f"{self.name} has fallen!")
+            if old_hp > 0:  # Only report the transition from alive to dead once
+                game.character_defeated(self)
 
     def heal(self, game: 'Game') -> int:
         """Use a potion to heal"""
         if self.potions > 0:
             game.add_message(f"{self.name} uses a potion to heal 15 HP.")
             # Add heal animation
-            game.add_effect(Effect(self.get_pixel_pos(), self.get_pixel_pos(), HEAL_COLOR, effect_type="heal"))
+            game.spawn_effect(self.get_pixel_pos(), self.get_pixel_pos(), HEAL_COLOR, effect_type="heal")
             self.hp = min(self.hp + 15, self.max_hp)
             self.potions -= 1
             game.add_message(f"HP after healing: {self.hp}/{self.max_hp} | Potions left: {self.potions}")
@@ -1093,35 +1353,68 @@ class Character:
             return 0
 
     def get_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
-        """Get basic actions available to all characters"""
-        actions = []
+        """Get available actions: Stride, the potion, the class's ACTION_SPEC and End Turn"""
+        position = self.position
         
         # If in movement confirmation mode, show confirm/cancel options
         if game.movement_confirmation_mode and game.selected_character == self:
-            actions.append(("Confirm Move [1]", self.position, lambda: game.confirm_movement()))
-            actions.append(("Cancel Move [0]", self.position, lambda: game.cancel_movement()))
-            return actions
+            return [("Confirm Move [1]", position, game.confirm_movement),
+                    ("Cancel Move [0]", position, game.cancel_movement)]
+        
+        actions_left = game.actions_left
+        actions = []
+        
+        # Add Stride action button (doesn't show movement squares yet) and the potion
+        if actions_left >= 1:
+            actions.append(("Stride [1]", position, partial(self.select_stride, game)))
+            if self.potions > 0:
+                actions.append((self.POTION_LABEL, position, partial(self.heal, game)))
+        
+        # Actions that need a target are only offered for a living selected target
+        target = game.selected_target
+        distance = position.distance_to(target.position) if target and target.is_alive() else None
+        
+        for label, cost, method, action_id, reach, kwargs, unless in self.ACTION_SPEC:
+            if cost > actions_left:
+                continue
+            if action_id is None:
+                if not (unless and getattr(self, unless)):
+                    actions.append((label, position, partial(getattr(self, method), game)))
+            elif distance is not None and (reach is None or distance <= reach):
+                actions.append((label, position,
+                                (action_id, partial(getattr(self, method), game=game, **(kwargs or {})))))
+        
+        # Always add End Turn action
+        actions.append(("End Turn [0]", position, game.next_turn))
         
-        # Add Stride action button (doesn't show movement squares yet)
-        if game.actions_left >= 1:
-            actions.append(("Stride", self.position, lambda: self.select_stride(game)))
-            
-        # Add Heal action
-        if game.actions_left >= 1 and self.potions > 0:
-            actions.append(("Potion", self.position, lambda: self.heal(game)))
-            
         return actions
+    
+    def _actions_key(self, game: 'Game') -> tuple:
+        """Everything get_actions depends on; subclasses add their own flags"""
+        target = game.selected_target
+        return (game.actions_left, self.potions, self.position,
+                game.movement_confirmation_mode and game.selected_character is self,
+                target, target is not None and target.is_alive(),
+                target.position if target is not None else None)
+    
+    def get_cached_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
+        """get_actions, rebuilt only when the state it depends on has changed"""
+        key = self._actions_key(game)
+        if key != self._actions_cache_key:
+            self._actions_cache = self.get_actions(game)
+            self._actions_cache_key = key
+        return self._actions_cache
         
     def select_stride(self, game: 'Game') -> Tuple[int, bool]:
         """Select Stride action to show movement options"""
         game.selected_character = self
-        game.highlighted_squares = self.get_valid_moves(game)
+        game.highlighted_squares = set(self.get_valid_moves(game))
         game.add_message(f"{self.name} is selecting where to Stride (move up to {self.speed} feet)")
         return 0, True  # Don't consume action yet, will be consumed on actual move
 
     def get_pixel_pos(self) -> Tuple[int, int]:
         """Get the pixel position of the character for animations"""
-        return (self.position.x * GRID_SIZE, self.position.y * GRID_SIZE)
+        return self.position.get_pixel_pos()
 
     def add_condition(self, condition_name: str, duration: int = 1):
         """Add a condition to the character"""
@@ -1163,11 +1456,17 @@ class Fighter(Character):
         AC: 18
         Attack Bonus: +9
     """
+    ACTION_SPEC = (
+        ActionSpec("Raise Shield [1]", 1, 'raise_shield', unless='shield_raised'),
+        ActionSpec("Strike [1]", 1, 'attack', ActionID.STRIKE, 1, {'dice': (1, 10)}),
+        ActionSpec("Power Attack [2]", 2, 'power_attack', ActionID.POWER_ATTACK, 1),
+    )
+    
     def __init__(self, name: str):
         super().__init__(name, hp=50, ac=18, attack_bonus=9)
         self.color = FIGHTER_COLOR
         self.shield_raised = False  # Track if shield is currently raised
-        self.load_sprite(IMAGE_PATHS['fighter'])
+        self.load_sprite(_FIGHTER_SPRITE)
         
     def get_ac(self) -> int:
         """Get AC including shield bonus if raised"""
@@ -1176,49 +1475,9 @@ class Fighter(Character):
             return base_ac + 2
         return base_ac
     
-    def get_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
-        """Get available actions for the fighter"""
-        actions = []  # Start fresh instead of using super() to control action order
-        
-        # If in movement confirmation mode, show confirm/cancel options
-        if game.movement_confirmation_mode and game.selected_character == self:
-            actions.append(("Confirm Move [1]", self.position, lambda: game.confirm_movement()))
-            actions.append(("Cancel Move [0]", self.position, lambda: game.cancel_movement()))
-            return actions
-        
-        # Add Stride action button (doesn't show movement squares yet)
-        if game.actions_left >= 1:
-            actions.append(("Stride [1]", self.position, lambda: self.select_stride(game)))
-            
-        # Add Heal action
-        if game.actions_left >= 1 and self.potions > 0:
-            actions.append(("Heal [1]", self.position, lambda: self.heal(game)))
-        
-        # Add Raise Shield action if shield is not already raised
-        if game.actions_left >= 1 and not self.shield_raised:
-            actions.append(("Raise Shield [1]", self.position, lambda: self.raise_shield(game)))
-        
-        # Add melee actions if we have a selected target
-        if game.selected_target and game.selected_target.is_alive():
-            distance = self.position.distance_to(game.selected_target.position)
-            target = game.selected_target  # Store target to avoid lambda capture issues
-            
-            if distance <= 1:  # Melee range
-                # Add Strike if we have enough actions
-                if game.actions_left >= 1:
-                    actions.append(("Strike [1]", self.position,
-                                  ("Strike", lambda t: self.attack(t, game, dice=(1, 10)))))
-                
-                # Add Power Attack if we have enough actions
-                if game.actions_left >= 2:
-                    actions.append(("Power Attack [2]", self.position, 
-                                  ("Power Attack", lambda t: self.power_attack(t, game))))
-        
-        # Always add End Turn action
-        actions.append(("End Turn [0]", self.position, lambda: game.next_turn()))
-        
-        return actions
-        
+    def _actions_key(self, game: 'Game') -> tuple:
+        return super()._actions_key(game) + (self.shield_raised,)
+    
     def power_attack(self, target: 'Character', game: 'Game') -> Tuple[int, bool]:
         """Execute a Power Attack action"""
         if game.actions_left < 2:
@@ -1228,7 +1487,7 @@ class Fighter(Character):
         game.add_message(f"{self.name} uses Power Attack!")
         
         # Add power attack animation
-        game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), POWER_ATTACK_COLOR, effect_type="power_attack"))
+        game.spawn_effect(self.get_pixel_pos(), target.get_pixel_pos(), POWER_ATTACK_COLOR, effect_type="power_attack")
         
         used, hit = self.attack(target, game, dice=(2, 10), bonus_damage=2)
         return 2, True  # Always consume 2 actions, regardless of hit
@@ -1246,7 +1505,7 @@ class Fighter(Character):
         game.add_message(f"{self.name} raises their shield! (+2 AC until start of next turn)")
         
         # Add shield animation
-        game.add_effect(Effect(self.get_pixel_pos(), self.get_pixel_pos(), SHIELD_COLOR, effect_type="shield"))
+        game.spawn_effect(self.get_pixel_pos(), self.get_pixel_pos(), SHIELD_COLOR, effect_type="shield")
         
         self.shield_raised = True
         return 1, True
@@ -1258,8 +1517,7 @@ class Fighter(Character):
         
         # Draw shield indicator if shield is raised
         if self.shield_raised:
-            x = self.position.x * GRID_SIZE
-            y = self.position.y * GRID_SIZE
+            x, y = self.position.get_pixel_pos()
             
             # Draw a blue shield glow around the fighter
             pulse = abs(math.sin(pygame.time.get_ticks() / 400))  # Slower pulse for shield
@@ -1286,6 +1544,20 @@ class Fighter(Character):
             pygame.draw.polygon(surface, shield_icon_color, shield_points)
             pygame.draw.polygon(surface, (255, 255, 255), shield_points, 1)
 
+    def plan_action(self, game: 'Game') -> bool:
+        """AI: close in on the nearest enemy, then Power Attack when there are actions for it"""
+        target, distance = self.nearest(game.living_enemies)
+        if target is None:
+            return False
+        if distance > 1:  # Move closer if not adjacent
+            return self._move_toward(game, target.position)
+        if game.ai_actions_remaining >= 2:
+            used, _ = self.power_attack(target, game)
+        else:
+            used, _ = self.attack(target, game, dice=(1, 10))
+        game.ai_actions_remaining -= used
+        return True
+
 class Rogue(Character):
     """
     Rogue class character focusing on mobility and tactical positioning.
@@ -1298,51 +1570,17 @@ class Rogue(Character):
         Attack Bonus: +8
         Speed: 30 feet (faster than other classes)
     """
+    ACTION_SPEC = (
+        ActionSpec("Strike [1]", 1, 'strike', ActionID.STRIKE, 1),
+        ActionSpec("Twin Feint [2]", 2, 'twin_feint', ActionID.TWIN_FEINT, 1),
+    )
+    
     def __init__(self, name: str):
         super().__init__(name, hp=38, ac=17, attack_bonus=8)
         self.color = ROGUE_COLOR
-        self.load_sprite(IMAGE_PATHS['rogue'])
+        self.load_sprite(_ROGUE_SPRITE)
         self.speed = 30  # Rogues are faster
         
-    def get_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
-        """Get available actions for the rogue"""
-        actions = []  # Start fresh instead of using super()
-        
-        # If in movement confirmation mode, show confirm/cancel options
-        if game.movement_confirmation_mode and game.selected_character == self:
-            actions.append(("Confirm Move [1]", self.position, lambda: game.confirm_movement()))
-            actions.append(("Cancel Move [0]", self.position, lambda: game.cancel_movement()))
-            return actions
-        
-        # Add Stride action button (doesn't show movement squares yet)
-        if game.actions_left >= 1:
-            actions.append(("Stride [1]", self.position, lambda: self.select_stride(game)))
-            
-        # Add Heal action
-        if game.actions_left >= 1 and self.potions > 0:
-            actions.append(("Heal [1]", self.position, lambda: self.heal(game)))
-        
-        # Add melee actions if we have a selected target
-        if game.selected_target and game.selected_target.is_alive():
-            distance = self.position.distance_to(game.selected_target.position)
-            target = game.selected_target  # Store target to avoid lambda capture issues
-            
-            if distance <= 1:  # Melee range
-                # Add Strike if we have enough actions
-                if game.actions_left >= 1:
-                    actions.append(("Strike [1]", self.position,
-                                  ("Strike", lambda t: self.strike(t, game))))
-                
-                # Add Twin Feint if we have enough actions
-                if game.actions_left >= 2:
-                    actions.append(("Twin Feint [2]", self.position,
-                                  ("Twin Feint", lambda t: self.twin_feint(t, game))))
-        
-        # Always add End Turn action
-        actions.append(("End Turn [0]", self.position, lambda: game.next_turn()))
-        
-        return actions
-        
     def strike(self, target: 'Character', game: 'Game') -> Tuple[int, bool]:
         """Execute a Strike with potential Sneak Attack"""
         if game.actions_left < 1:
@@ -1374,6 +1612,20 @@ class Rogue(Character):
         
         return 2, hit1 or hit2  # Always consume exactly 2 actions total
 
+    def plan_action(self, game: 'Game') -> bool:
+        """AI: move into a flanking position, then Strike if flanking or Twin Feint if not"""
+        target, distance = self.nearest(game.living_enemies)
+        if target is None:
+            return False
+        if distance > 1:  # If not adjacent, try to move into flanking position
+            return self._move_toward(game, target.position, game._flank_squares_for(target, self))
+        if not self.is_flanking(target, game) and game.ai_actions_remaining >= 2:
+            used, _ = self.twin_feint(target, game)
+        else:
+            used, _ = self.strike(target, game)
+        game.ai_actions_remaining -= used
+        return True
+
 class Wizard(Character):
     """
     Wizard class character specializing in ranged magical attacks.
@@ -1393,56 +1645,25 @@ class Wizard(Character):
     ARCANE_BLAST_RANGE = 4  # 20 feet
     MAGIC_MISSILE_RANGE = 24  # 120 feet
     
+    ACTION_SPEC = (
+        ActionSpec("Arcane Blast [1]", 1, 'arcane_blast', ActionID.ARCANE_BLAST, ARCANE_BLAST_RANGE),
+        ActionSpec("Magic Missile [1]", 1, 'magic_missile', ActionID.MAGIC_MISSILE, MAGIC_MISSILE_RANGE,
+                   {'action_count': 1}),
+        ActionSpec("Magic Missile [2]", 2, 'magic_missile', ActionID.MAGIC_MISSILE, MAGIC_MISSILE_RANGE,
+                   {'action_count': 2}),
+        ActionSpec("Magic Missile [3]", 3, 'magic_missile', ActionID.MAGIC_MISSILE, MAGIC_MISSILE_RANGE,
+                   {'action_count': 3}),
+        ActionSpec("Shield [1]", 1, 'cast_shield', unless='shield_up'),
+    )
+    
     def __init__(self, name: str):
         super().__init__(name, hp=32, ac=16, attack_bonus=6)
         self.color = WIZARD_COLOR
         self.shield_up = False
-        self.load_sprite(IMAGE_PATHS['wizard'])
-        
-    def get_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
-        """Get available actions for the wizard"""
-        actions = []  # Start fresh instead of using super()
-        
-        # If in movement confirmation mode, show confirm/cancel options
-        if game.movement_confirmation_mode and game.selected_character == self:
-            actions.append(("Confirm Move [1]", self.position, lambda: game.confirm_movement()))
-            actions.append(("Cancel Move [0]", self.position, lambda: game.cancel_movement()))
-            return actions
-        
-        # Add Stride action button (doesn't show movement squares yet)
-        if game.actions_left >= 1:
-            actions.append(("Stride [1]", self.position, lambda: self.select_stride(game)))
-            
-        # Add Heal action
-        if game.actions_left >= 1 and self.potions > 0:
-            actions.append(("Heal [1]", self.position, lambda: self.heal(game)))
-        
-        # Add spells that need targeting
-        if game.selected_target and game.selected_target.is_alive():
-            distance = self.position.distance_to(game.selected_target.position)
-            target = game.selected_target  # Store target to avoid lambda capture issues
-            
-            # Add Arcane Blast if in range and have enough actions
-            if distance <= self.ARCANE_BLAST_RANGE and game.actions_left >= 1:
-                actions.append(("Arcane Blast [1]", self.position,
-                              ("Arcane Blast", lambda t: self.arcane_blast(target, game))))
-            
-            # Add Magic Missile options if in range and have enough actions
-            if distance <= self.MAGIC_MISSILE_RANGE:
-                for i in range(1, min(game.actions_left + 1, 4)):
-                    count = i  # Store count to avoid lambda capture issues
-                    actions.append((f"Magic Missile [{i}]", self.position,
-                                  (f"Magic Missile ({i})", 
-                                   lambda t, c=count: self.magic_missile(t, game, c))))
-        
-        # Add Shield spell (no target needed) if have enough actions and not already up
-        if game.actions_left >= 1 and not self.shield_up:
-            actions.append(("Shield [1]", self.position, lambda: self.cast_shield(game)))
-        
-        # Always add End Turn action
-        actions.append(("End Turn [0]", self.position, lambda: game.next_turn()))
-        
-        return actions
+        self.load_sprite(_WIZARD_SPRITE)
+    
+    def _actions_key(self, game: 'Game') -> tuple:
+        return super()._actions_key(game) + (self.shield_up,)
         
     def arcane_blast(self, target: 'Character', game: 'Game') -> Tuple[int, bool]:
         """Execute an Arcane Blast attack"""
@@ -1475,7 +1696,7 @@ class Wizard(Character):
         
         # Add magic missile animation for each missile
         for i in range(action_count):
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), MAGIC_MISSILE_COLOR, effect_type="magic_missile"))
+            game.spawn_effect(self.get_pixel_pos(), target.get_pixel_pos(), MAGIC_MISSILE_COLOR, effect_type="magic_missile")
             dice_roll = random.randint(1, 4)
             dmg = dice_roll + 1
             game.add_message(f"Magic Missile #{i+1}: d4 + 1 = [{dice_roll}] + 1 = {dmg} force damage")
@@ -1493,12 +1714,23 @@ class Wizard(Character):
         game.add_message(f"{self.name} casts Shield! +2 AC until next turn.")
         
         # Add shield animation
-        game.add_effect(Effect(self.position, self.position, SHIELD_COLOR, effect_type="shield"))
+        game.spawn_effect(self.position, self.position, SHIELD_COLOR, effect_type="shield")
         
         self.base_ac += 2
         self.shield_up = True
         return 1, True
     
+    def plan_action(self, game: 'Game') -> bool:
+        """AI: prioritize ranged magic attacks, moving only when nothing is in range"""
+        target, distance = self.nearest(game.living_enemies)
+        if target is None:
+            return False
+        if distance > self.MAGIC_MISSILE_RANGE:
+            return self._move_toward(game, target.position)
+        used, _ = self.magic_missile(target, game, game.ai_actions_remaining)
+        game.ai_actions_remaining -= used
+        return True
+    
 class Cleric(Character):
     """
     Cleric class character specializing in supportive magical spells.
@@ -1520,70 +1752,31 @@ class Cleric(Character):
     LESSER_HEAL_UP_RANGE = 6 # 30 feet
     SANCTUARY_RANGE = 1 # 5 feet
     SPIRIT_LINK_RANGE = 6 # 30 feet
+    # Range of each spell cast on an ally, keyed by action id
+    ALLY_SPELL_RANGES = {
+        ActionID.SPIRIT_LINK: SPIRIT_LINK_RANGE,
+        ActionID.SANCTUARY: SANCTUARY_RANGE,
+        ActionID.HEAL_TOUCH: LESSER_HEAL_RANGE,
+        ActionID.HEAL_RANGED: LESSER_HEAL_UP_RANGE,
+        ActionID.HEAL_BURST: LESSER_HEAL_UP_RANGE,
+    }
+    
+    POTION_LABEL = "Potion [1]"
+    ACTION_SPEC = (
+        ActionSpec("Strike [1]", 1, 'attack', ActionID.STRIKE, 1, {'dice': (1, 6)}),
+        ActionSpec("Spirit Link [1]", 1, 'spirit_link', ActionID.SPIRIT_LINK, SPIRIT_LINK_RANGE),
+        ActionSpec("Sanctuary [1]", 1, 'sanctuary', ActionID.SANCTUARY, SANCTUARY_RANGE),
+        ActionSpec("Heal [1]", 1, 'lesser_heal', ActionID.HEAL_TOUCH, LESSER_HEAL_RANGE, {'action_count': 1}),
+        ActionSpec("Heal [2]", 2, 'lesser_heal', ActionID.HEAL_RANGED, LESSER_HEAL_UP_RANGE, {'action_count': 2}),
+        # AoE, no target distance check needed
+        ActionSpec("Heal [3]", 3, 'lesser_heal', ActionID.HEAL_BURST, None, {'action_count': 3}),
+    )
     
     def __init__(self, name: str):
         super().__init__(name, hp=32, ac=16, attack_bonus=6)
         self.color = CLERIC_COLOR
         # self.shield_up = False
-        self.load_sprite(IMAGE_PATHS['cleric'])
-        
-    def get_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
-        """Get available actions for the cleric"""
-        actions = []  # Start fresh instead of using super()
-        
-        # If in movement confirmation mode, show confirm/cancel options
-        if game.movement_confirmation_mode and game.selected_character == self:
-            actions.append(("Confirm Move [1]", self.position, lambda: game.confirm_movement()))
-            actions.append(("Cancel Move [0]", self.position, lambda: game.cancel_movement()))
-            return actions
-        
-        # Add Stride action button (doesn't show movement squares yet)
-        if game.actions_left >= 1:
-            actions.append(("Stride [1]", self.position, lambda: self.select_stride(game)))
-            
-        # Add Heal action (potion)
-        if game.actions_left >= 1 and self.potions > 0:
-            actions.append(("Potion [1]", self.position, lambda: self.heal(game)))
-        
-        # Add spells that need targeting
-        if game.selected_target and game.selected_target.is_alive():
-            distance = self.position.distance_to(game.selected_target.position)
-            target = game.selected_target  # Store target to avoid lambda capture issues
-            
-            # Add Strike if in melee range and have enough actions
-            if distance <= 1 and game.actions_left >= 1:
-                actions.append(("Strike [1]", self.position,
-                              ("Strike", lambda t: self.attack(t, game, dice=(1, 6)))))
-            
-            # Add Spirit Link if in range and have enough actions
-            if distance <= self.SPIRIT_LINK_RANGE and game.actions_left >= 1:
-                actions.append(("Spirit Link [1]", self.position,
-                              ("Spirit Link", lambda t: self.spirit_link(target, game))))
-            
-            # Add Sanctuary if in range and have enough actions
-            if distance <= self.SANCTUARY_RANGE and game.actions_left >= 1:
-                actions.append(("Sanctuary [1]", self.position,
-                              ("Sanctuary", lambda t: self.sanctuary(target, game))))
-            
-            # Add Heal [1] if in touch range
-            if distance <= self.LESSER_HEAL_RANGE and game.actions_left >= 1:
-                actions.append(("Heal [1]", self.position,
-                                ("Heal (1)", lambda t: self.lesser_heal(target, game, 1))))
-
-            # Add Heal [2] if in 30-foot range
-            if  distance <= self.LESSER_HEAL_UP_RANGE and game.actions_left >= 2:
-                actions.append(("Heal [2]", self.position,
-                                ("Heal (2)", lambda t: self.lesser_heal(target, game, 2))))
-
-            # Add Heal [3] (AoE, no target check needed)
-            if game.actions_left >= 3:
-                actions.append(("Heal [3]", self.position,
-                                ("Heal (3)", lambda t: self.lesser_heal(target, game, 3))))
-        
-        # Always add End Turn action
-        actions.append(("End Turn [0]", self.position, lambda: game.next_turn()))
-        
-        return actions
+        self.load_sprite(_CLERIC_SPRITE)
         
     def spirit_link(self, target: 'Character', game: 'Game') -> Tuple[int, bool]:
         """Cast Spirit Link to balance HP between self and the target."""
@@ -1597,7 +1790,7 @@ class Cleric(Character):
         new_hp = total_hp // 2
 
         # Show visual effect
-        game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), SPIRIT_LINK_COLOR, effect_type="link"))
+        game.spawn_effect(self.get_pixel_pos(), target.get_pixel_pos(), SPIRIT_LINK_COLOR, effect_type="link")
 
         game.add_message(f"{self.name} casts Spirit Link on {target.name} to equalize their HP.")
         game.add_message(f"HP Before: {self.name} = {self.hp} HP | {target.name} = {target.hp} HP")
@@ -1646,7 +1839,7 @@ class Cleric(Character):
             dice_roll = random.randint(1, 8)
             heal_amount = dice_roll
             game.add_message(f"Healing: d8 = [{dice_roll}] = {heal_amount}")
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), HEAL_COLOR, effect_type="heal"))
+            game.spawn_effect(self.get_pixel_pos(), target.get_pixel_pos(), HEAL_COLOR, effect_type="heal")
             old_hp = target.hp
             target.hp = min(target.hp + heal_amount, target.max_hp)
             healed = target.hp - old_hp
@@ -1657,7 +1850,7 @@ class Cleric(Character):
             dice_roll = random.randint(1, 8)
             heal_amount = dice_roll + 8
             game.add_message(f"Healing: d8 + 8 = [{dice_roll}] + 8 = {heal_amount}")
-            game.add_effect(Effect(self.get_pixel_pos(), target.get_pixel_pos(), HEAL_COLOR, effect_type="heal"))
+            game.spawn_effect(self.get_pixel_pos(), target.get_pixel_pos(), HEAL_COLOR, effect_type="heal")
             old_hp = target.hp
             target.hp = min(target.hp + heal_amount, target.max_hp)
             healed = target.hp - old_hp
@@ -1670,14 +1863,15 @@ class Cleric(Character):
             game.add_message(f"Healing: d8 = [{dice_roll}] = {heal_amount}")
             game.add_message(f"A wave of healing energy pulses outward from {self.name}, restoring {heal_amount} HP to all allies in range!")
 
+            origin, heal_range = self.position, self.LESSER_HEAL_UP_RANGE
             for char in game.party:
                 if not char.is_alive() or char.is_enemy:
                     continue
-                if self.position.distance_to(char.position) <= self.LESSER_HEAL_UP_RANGE:
+                if origin.distance_to(char.position) <= heal_range:
                     old_hp = char.hp
                     char.hp = min(char.hp + heal_amount, char.max_hp)
                     healed = char.hp - old_hp
-                    game.add_effect(Effect(self.get_pixel_pos(), char.get_pixel_pos(), HEAL_COLOR, effect_type="heal"))
+                    game.spawn_effect(self.get_pixel_pos(), char.get_pixel_pos(), HEAL_COLOR, effect_type="heal")
                     if healed > 0:
                         game.add_message(f"{char.name} heals for {healed} HP. Now at {char.hp}/{char.max_hp} HP.")
                     else:
@@ -1685,6 +1879,48 @@ class Cleric(Character):
 
         return action_count, True
 
+    def plan_action(self, game: 'Game') -> bool:
+        """AI: heal whoever is missing the most HP, or fight the nearest enemy if nobody is hurt"""
+        # One pass finds the ally missing the most HP (the Cleric wins ties) and
+        # counts the hurt allies close enough for the 3-action burst
+        heal_range = self.LESSER_HEAL_UP_RANGE
+        px, py = self.position.x, self.position.y
+        target_ally, most_missing, distance, hurt_in_range = None, 0, 0, 0
+        for ally in game.party:
+            missing_hp = ally.max_hp - ally.hp
+            if missing_hp <= 0 or not ally.is_alive():
+                continue
+            ally_distance = max(abs(ally.position.x - px), abs(ally.position.y - py))
+            if ally_distance <= heal_range:
+                hurt_in_range += 1
+            if missing_hp > most_missing or (missing_hp == most_missing and ally is self):
+                target_ally, most_missing, distance = ally, missing_hp, ally_distance
+        
+        if target_ally is None:
+            target, distance = self.nearest(game.living_enemies)
+            if target is None:
+                return False
+            if distance > 1:
+                return self._move_toward(game, target.position)
+            used, _ = self.attack(target, game, dice=(1, 6))
+            game.ai_actions_remaining -= used
+            return True
+        
+        if distance <= self.LESSER_HEAL_RANGE:
+            action_count = 1
+        elif distance <= heal_range:
+            if hurt_in_range >= 2 and game.ai_actions_remaining >= 3:
+                action_count = 3
+            elif game.ai_actions_remaining >= 2:
+                action_count = 2
+            else:
+                return self._move_toward(game, target_ally.position)
+        else:
+            return self._move_toward(game, target_ally.position)
+        used, _ = self.lesser_heal(target_ally, game, action_count)
+        game.ai_actions_remaining -= used
+        return True
+
 class Enemy(Character):
     """
     Enemy class representing various hostile creatures.
@@ -1704,13 +1940,13 @@ class Enemy(Character):
         
         # Load appropriate sprite based on enemy type
         if name == "Goblin":
-            self.load_sprite(IMAGE_PATHS['goblin'])
+            self.load_sprite(_GOBLIN_SPRITE)
             self.speed = 25
         elif name == "Ogre":
-            self.load_sprite(IMAGE_PATHS['ogre'])
+            self.load_sprite(_OGRE_SPRITE)
             self.speed = 30
         elif name == "Wyvern":
-            self.load_sprite(IMAGE_PATHS['wyvern'])
+            self.load_sprite(_WYVERN_SPRITE)
             self.speed = 35
     
     def get_actions(self, game: 'Game') -> List[Tuple[str, GridPosition, callable]]:
@@ -1723,12 +1959,12 @@ class Enemy(Character):
                 distance = self.position.distance_to(char.position)
                 if distance <= 1:  # Melee range
                     actions.append(("Attack", char.position,
-                                  lambda t=char: self.attack(t, game, dice=self.damage_dice)))
+                                  partial(self.attack, char, game, dice=self.damage_dice)))
         
         # Add movement options
         if game.actions_left >= 1:
             for pos in self.get_valid_moves(game):
-                actions.append(("Move", pos, lambda p=pos: self.move_to(p, game)))
+                actions.append(("Move", pos, partial(self.move_to, pos, game)))
         
         return actions
 
@@ -1762,17 +1998,21 @@ class Game:
         self.windowed_size = (WINDOW_WIDTH, WINDOW_HEIGHT)
         
         self.clock = pygame.time.Clock()
-        self.state = "intro"
+        self.set_state("intro")
         self.selected_character = None
         self.selected_target = None
-        self.highlighted_squares = []
+        self.highlighted_squares = set()  # Squares the selected character can move to
         self.party = []
         self.enemies = []
         self.current_enemies = []
+        self._all_chars_cache = None  # Memoized result of get_all_characters()
+        self._occupancy_cache = None  # Memoized result of get_occupancy()
+        self.move_cache = {}  # get_valid_moves results keyed by (character, position), emptied when anyone moves
+        self._positions_dirty = False  # Someone moved since the last DEBUG overlap check
         self.current_enemy = None
         self.current_member_idx = 0
         self.actions_left = 3
-        self.messages = []
+        self.messages = deque(maxlen=MESSAGE_LOG_LIMIT)
         self.message_scroll = 0
         self.available_actions = []
         self.pending_action = None
@@ -1784,6 +2024,7 @@ class Game:
         self.upgrade_selection = None
         self.available_upgrades = ["Accuracy", "Damage", "Speed", "Vitality"]
         self.effects = []  # List to store active effects
+        self._effect_pool = []  # Finished effects kept for reuse by spawn_effect
         self.showing_help = False  # State for help overlay
         self.help_button_rect = None  # Store help button rectangle
         self.ai_action_queue = []  # Queue of AI actions to perform
@@ -1791,6 +2032,8 @@ class Game:
         self.ai_actions_remaining = 0  # Actions left for current AI character
         self._schedule_next_ai_action = False  # Flag to schedule next AI action after delay
         self._end_turn_after_delay = False  # Flag to end turn after delay
+        self.living_enemies = []  # Living enemies in the current wave, in wave order
+        self.living_party = []  # Living party members, in party order
         self.current_enemy_idx = 0  # Current enemy index for turn management
         self.enemy_actions_remaining = 0  # Actions left for current enemy
         self._schedule_next_enemy_action = False  # Flag to schedule next enemy action after delay
@@ -1815,14 +2058,10 @@ class Game:
         self.last_click_pos = None
         self.double_click_threshold = 500  # milliseconds
         
-        # Load blue square image
-        try:
-            if os.path.exists(IMAGE_PATHS['blue_square']):
-                original_blue_square = pygame.image.load(IMAGE_PATHS['blue_square']).convert_alpha()
-                self.blue_square_image = pygame.transform.scale(original_blue_square, (GRID_SIZE, GRID_SIZE))
-        except Exception as e:
-            print(f"Error loading blue square image: {e}")
-            self.blue_square_image = None
+        # Load every sprite now that the display exists (including the blue square image)
+        preload_sprites()
+        convert_cached_surfaces()
+        self.blue_square_image = _SPRITE_CACHE.get((_BLUE_SQUARE_SPRITE, GRID_SIZE))
         
         # Load background image
         self.background_image = None
@@ -1837,33 +2076,83 @@ class Game:
             print(f"Error loading background image: {e}")
             self.background_image = None
         
-        # Create surfaces
-        self.grid_surface = pygame.Surface((GRID_COLS * GRID_SIZE, GRID_ROWS * GRID_SIZE))
-        self.message_surface = pygame.Surface((WINDOW_WIDTH - 40, 200))
-        self.action_surface = pygame.Surface((WINDOW_WIDTH, 100))
-        self.overlay_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        # Create surfaces (converted to the display format so blits need no per-pixel conversion)
+        self.grid_surface = pygame.Surface((GRID_COLS * GRID_SIZE, GRID_ROWS * GRID_SIZE)).convert()
+        self.message_surface = pygame.Surface((WINDOW_WIDTH - 40, MESSAGE_LOG_HEIGHT)).convert()
+        self.action_surface = pygame.Surface((WINDOW_WIDTH, 100)).convert()
+        self.indicator_surface = pygame.Surface((200, 40)).convert()
+        self.overlay_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA).convert_alpha()
+        
+        # The floor (background image if available, otherwise solid color) with the grid lines
+        # on top never changes, so it is composed once and each frame starts from a single blit
+        self.grid_background = self.grid_surface.copy()
+        if self.background_image:
+            self.grid_background.blit(self.background_image, (0, 0))
+        else:
+            self.grid_background.fill(BACKGROUND_COLOR)
+        self.grid_background.blit(_GRID_LINES_SURFACE, (0, 0))
+        
+        # Semi-transparent black background shared by the full-screen overlays
+        self.overlay_bg = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self.overlay_bg.fill((0, 0, 0))
+        self.overlay_bg.set_alpha(180)
         self.action_buttons = []
+        self._action_buttons_drawn_for = None  # available_actions list currently drawn on action_surface
+        self._action_button_hits = []  # (rect, action) pairs for that list
+        self._message_area_rect = pygame.Rect(20, WINDOW_HEIGHT - 300, WINDOW_WIDTH - 40, 200)  # Scrollable log area
+        self._button_text_cache = {}  # Rendered button and turn indicator labels keyed by their text
+        
+        # Partial display update tracking for static UI screens
+        self._dirty_rects = []  # Screen regions drawn during the current frame
+        self._prev_dirty_rects = []  # Screen regions drawn during the previous frame
+        self._presented_state = None  # State shown by the last display update
+        self._screen_dirty = True  # Something may have changed since the last frame was drawn
+        self._intro_blits = None  # Rendered intro screen text, see draw_intro_screen
+        self._end_screen_text = {}  # Rendered end screen text keyed by state
         
         self.init_game()
     
-    def add_effect(self, effect: Effect):
-        """Add a new visual effect"""
+    def spawn_effect(self, *args, **kwargs) -> Effect:
+        """Start a visual effect (same arguments as Effect), reusing a finished one when possible"""
+        if self._effect_pool:
+            effect = self._effect_pool.pop()
+            effect.reset(*args, **kwargs)
+        else:
+            effect = Effect(*args, **kwargs)
         self.effects.append(effect)
+        return effect
 
     def update_effects(self):
-        """Update and remove finished effects"""
-        self.effects = [effect for effect in self.effects if effect.update()]
+        """Update and remove finished effects, returning them to the pool"""
+        # Effects are advanced here, one frame per call, with no method call per effect.
+        # Still-running effects are compacted to the front of the list in place, so frames where
+        # nothing expires allocate nothing.
+        effects = self.effects
+        kept = 0
+        for effect in effects:
+            effect.current_frame += 1
+            if effect.current_frame < effect.duration:
+                effects[kept] = effect
+                kept += 1
+            else:
+                self._effect_pool.append(effect)
+        del effects[kept:]
 
     def init_game(self):
         """Initialize the game state"""
-        self.state = "intro"  # Changed from "class_select" to "intro"
+        self.set_state("intro")  # Changed from "class_select" to "intro"
         self.party = []
         self.enemies = []
         self.current_enemies = []
+        self._all_chars_cache = None
+        self._occupancy_cache = None
+        self.move_cache.clear()
+        self.living_enemies = []
+        self.living_party = []
         self.current_enemy = None
         self.current_member_idx = 0
         self.actions_left = 3
-        self.messages = []
+        self.messages = deque(maxlen=MESSAGE_LOG_LIMIT)
         self.wave_number = 0  # Initialize wave number to 0
         self.available_actions = [
             ("Start Game", GridPosition(GRID_COLS//2, GRID_ROWS-2), lambda: self.start_game())
@@ -1871,23 +2160,88 @@ class Game:
     
     def add_message(self, message: str):
         """Add a message to the message log"""
-        self.messages.append(message)
+        # Each entry is [message, rendered line], so a line's surface goes when the message drops off the log
+        self.messages.append([message, None])
+        self._screen_dirty = True
         print(message)  # Also print to terminal/console
         # Automatically scroll to bottom when new message arrives
         self.message_scroll = max(0, len(self.messages) - 8)  # Show last 8 messages
     
-    def get_all_characters(self) -> List['Character']:
-        """Get list of all characters in the game that are actually on the grid"""
-        chars = self.party.copy()
-        # Only include enemies that are positioned on the grid (not at -1, -1)
-        chars.extend([enemy for enemy in self.current_enemies 
-                     if enemy.position.x >= 0 and enemy.position.y >= 0])
-        return chars
+    def get_all_characters(self) -> Tuple['Character', ...]:
+        """
+        Get all characters in the game that are actually on the grid.
+        The result only changes when the party or the current wave is set up,
+        so it is cached until then.
+        """
+        if self._all_chars_cache is None:
+            chars = self.party.copy()
+            # Only include enemies that are positioned on the grid (not at -1, -1)
+            chars.extend([enemy for enemy in self.current_enemies 
+                         if enemy.position.x >= 0 and enemy.position.y >= 0])
+            self._all_chars_cache = tuple(chars)
+        return self._all_chars_cache
+    
+    def character_defeated(self, char: 'Character'):
+        """Update bookkeeping when a character drops to 0 HP"""
+        if char.is_enemy:
+            self.living_enemies.remove(char)
+        else:
+            self.living_party.remove(char)
+        if self._occupancy_cache is not None:
+            self._occupancy_cache.pop((char.position.x, char.position.y), None)
+        self.move_cache.clear()
+    
+    def character_moved(self, char: 'Character', old_pos: 'GridPosition'):
+        """Update bookkeeping when a character changes squares"""
+        self._positions_dirty = True
+        self.move_cache.clear()
+        if self._occupancy_cache is not None:
+            self._occupancy_cache.pop((old_pos.x, old_pos.y), None)
+            self._occupancy_cache[(char.position.x, char.position.y)] = char
+    
+    def get_occupancy(self) -> Dict[Tuple[int, int], 'Character']:
+        """
+        Map each occupied grid square to the living character standing on it.
+        The map is kept up to date by character_moved and character_defeated,
+        and rebuilt whenever the party or the current wave is set up.
+        """
+        if self._occupancy_cache is None:
+            self._occupancy_cache = {(char.position.x, char.position.y): char
+                                     for char in self.get_all_characters() if char.is_alive()}
+        return self._occupancy_cache
+    
+    def _flank_squares_for(self, target: 'Character', attacker: 'Character') -> set:
+        """
+        Squares from which attacker would flank target, matching Character.is_flanking:
+        the square mirroring each of attacker's allies next to the target.
+        """
+        tx, ty = target.position.x, target.position.y
+        occupied = self.get_occupancy()
+        squares = set()
+        for cell in _ADJACENT_CELLS.get((tx, ty), ()):
+            ally = occupied.get(cell)
+            if ally is None or ally is attacker or ally.is_enemy != attacker.is_enemy:
+                continue
+            squares.add((2 * tx - cell[0], 2 * ty - cell[1]))
+        return squares
+    
+    def render_button_text(self, text: str) -> pygame.Surface:
+        """Render a button or turn indicator label, reusing the surface if the label was drawn before"""
+        surf = self._button_text_cache.get(text)
+        if surf is None:
+            surf = self._button_text_cache[text] = FONT.render(text, True, TEXT_COLOR)
+        return surf
     
     def draw_action_buttons(self):
         """Draw action buttons at the bottom of the screen"""
+        # available_actions is replaced rather than changed in place, so the same list
+        # means the buttons already on action_surface are still correct
+        if self.available_actions is self._action_buttons_drawn_for:
+            self.action_buttons = self._action_button_hits
+            return
+        self._action_buttons_drawn_for = self.available_actions
         self.action_surface.fill(BACKGROUND_COLOR)
-        self.action_buttons = []  # Clear previous buttons
+        self.action_buttons = self._action_button_hits = []  # Clear previous buttons
         
         if not self.available_actions:
             return
@@ -1912,12 +2266,12 @@ class Game:
             pygame.draw.rect(self.action_surface, (255, 255, 255), button_rect, 2)
             
             # Draw button text
-            text = FONT.render(action_name, True, TEXT_COLOR)
+            text = self.render_button_text(action_name)
             text_rect = text.get_rect(center=button_rect.center)
             self.action_surface.blit(text, text_rect)
             
             # Store button with its action
-            self.action_buttons.append((button_rect.copy(), action_func))
+            self.action_buttons.append((button_rect, action_func))
             
             x += button_width + BUTTON_MARGIN
 
@@ -2024,7 +2378,7 @@ class Game:
                     if button_rect.collidepoint(adjusted_pos[0], button_y):
                         if isinstance(action_func, tuple):
                             # This is an action that needs a target
-                            action_name, action_func = action_func
+                            action_id, action_func = action_func
                             if self.selected_target and self.selected_target.is_alive():  # Valid target check
                                 self.perform_action(action_func, self.selected_target)
                                 # Only clear target if it died
@@ -2032,9 +2386,9 @@ class Game:
                                     self.selected_target = None
                                 self.update_available_actions()
                             else:  # If no target selected or target is dead, enter target selection mode
-                                self.pending_action = (action_name, action_func)
+                                self.pending_action = (action_id, action_func)
                                 self.valid_targets = self.get_valid_targets()
-                                self.add_message(f"Select a target for {action_name}")
+                                self.add_message(f"Select a target for {action_id.label}")
                         else:
                             self.perform_action(action_func)
                         self.update_available_actions()
@@ -2048,48 +2402,49 @@ class Game:
             return
         
         clicked_pos = GridPosition(grid_x, grid_y)
+        # The living character on the clicked square, if any
+        clicked_char = self.get_occupancy().get((grid_x, grid_y))
         
         # Handle right-click targeting
         if right_click and self.current_member_idx < len(self.party):
             current_char = self.party[self.current_member_idx]
             
             # First check for enemies
-            for enemy in self.current_enemies:
-                if enemy.position == clicked_pos and enemy.is_alive():
-                    distance = current_char.position.distance_to(enemy.position)
-                    # Check if target is in range based on character type
-                    valid_target = False
-                    if isinstance(current_char, (Fighter, Rogue)):
-                        valid_target = distance <= 1  # Melee range
-                    elif isinstance(current_char, Wizard):
-                        valid_target = distance <= current_char.MAGIC_MISSILE_RANGE
-                    elif isinstance(current_char, Cleric):
-                        valid_target = distance <= current_char.SPIRIT_LINK_RANGE
-                    
-                    if valid_target:
-                        self.selected_character = current_char
-                        self.selected_target = enemy
-                        self.add_message(f"Selected {enemy.name} as target. Choose an action.")
-                        self.update_available_actions()
-                    else:
-                        self.add_message(f"{enemy.name} is out of range!")
-                    return
+            if clicked_char is not None and clicked_char.is_enemy:
+                enemy = clicked_char
+                distance = current_char.position.distance_to(enemy.position)
+                # Check if target is in range based on character type
+                valid_target = False
+                if isinstance(current_char, (Fighter, Rogue)):
+                    valid_target = distance <= 1  # Melee range
+                elif isinstance(current_char, Wizard):
+                    valid_target = distance <= current_char.MAGIC_MISSILE_RANGE
+                elif isinstance(current_char, Cleric):
+                    valid_target = distance <= current_char.SPIRIT_LINK_RANGE
+                
+                if valid_target:
+                    self.selected_character = current_char
+                    self.selected_target = enemy
+                    self.add_message(f"Selected {enemy.name} as target. Choose an action.")
+                    self.update_available_actions()
+                else:
+                    self.add_message(f"{enemy.name} is out of range!")
+                return
             
             # Then check for allies (for Cleric spells)
-            if isinstance(current_char, Cleric):
-                for ally in self.party:
-                    if ally.position == clicked_pos and ally.is_alive():
-                        distance = current_char.position.distance_to(ally.position)
-                        valid_target = distance <= current_char.SPIRIT_LINK_RANGE
-                        
-                        if valid_target:
-                            self.selected_character = current_char
-                            self.selected_target = ally
-                            self.add_message(f"Selected {ally.name} as target. Choose an action.")
-                            self.update_available_actions()
-                        else:
-                            self.add_message(f"{ally.name} is out of range!")
-                        return
+            if isinstance(current_char, Cleric) and clicked_char is not None and not clicked_char.is_enemy:
+                ally = clicked_char
+                distance = current_char.position.distance_to(ally.position)
+                valid_target = distance <= current_char.SPIRIT_LINK_RANGE
+                
+                if valid_target:
+                    self.selected_character = current_char
+                    self.selected_target = ally
+                    self.add_message(f"Selected {ally.name} as target. Choose an action.")
+                    self.update_available_actions()
+                else:
+                    self.add_message(f"{ally.name} is out of range!")
+                return
             
             # If we clicked empty space or invalid target, clear the target
             self.selected_target = None
@@ -2098,14 +2453,14 @@ class Game:
         
         # Handle target selection if we have a pending action
         if self.pending_action:
-            for target in self.valid_targets:
-                if target.position == clicked_pos:
-                    _, action_func = self.pending_action
-                    self.perform_action(action_func, target)
-                    self.pending_action = None
-                    self.valid_targets = []
-                    self.update_available_actions()
-                    return
+            # Valid targets are all alive, so a target on the clicked square is the one standing there
+            if clicked_char is not None and clicked_char in self.valid_targets:
+                _, action_func = self.pending_action
+                self.perform_action(action_func, clicked_char)
+                self.pending_action = None
+                self.valid_targets = []
+                self.update_available_actions()
+                return
             
             # If we clicked somewhere else, cancel the pending action
             self.pending_action = None
@@ -2117,13 +2472,7 @@ class Game:
         # Handle movement
         if self.selected_character and clicked_pos in self.highlighted_squares:
             # Check if space is occupied by a living character
-            space_occupied = False
-            for char in self.get_all_characters():
-                if char != self.selected_character and char.position == clicked_pos and char.is_alive():
-                    space_occupied = True
-                    break
-            
-            if not space_occupied:
+            if clicked_char is None or clicked_char is self.selected_character:
                 # Check if this is a double-click on the already selected movement square
                 if (is_double_click and self.selected_movement_square and 
                     self.selected_movement_square == clicked_pos and 
@@ -2140,21 +2489,13 @@ class Game:
             else:
                 self.add_message("Cannot move to an occupied space!")
         else:
-            # Try to select a character at the clicked position
-            for char in self.get_all_characters():
-                if char.position == clicked_pos:
-                    if char in self.party and self.current_member_idx == self.party.index(char):
-                        self.selected_character = char
-                        # Get valid moves (excluding occupied spaces)
-                        all_moves = char.get_valid_moves(self)
-                        self.highlighted_squares = [
-                            pos for pos in all_moves 
-                            if not any(other.position == pos and other.is_alive()
-                                     for other in self.get_all_characters()
-                                     if other != char)
-                        ]
-                        self.update_available_actions()
-                        break
+            # Try to select the current party member at the clicked position
+            if (clicked_char is not None and self.current_member_idx < len(self.party)
+                    and clicked_char is self.party[self.current_member_idx]):
+                self.selected_character = clicked_char
+                # Valid moves already leave out squares held by other living characters
+                self.highlighted_squares = set(clicked_char.get_valid_moves(self))
+                self.update_available_actions()
     
     def update_available_actions(self):
         """Update the list of available actions"""
@@ -2182,7 +2523,7 @@ class Game:
         elif self.state == "combat" and self.current_member_idx < len(self.party):
             current_char = self.party[self.current_member_idx]
             if current_char.is_alive():
-                self.available_actions = current_char.get_actions(self)
+                self.available_actions = current_char.get_cached_actions(self)
     
     def choose_class(self, choice: str):
         """Handle class selection"""
@@ -2205,32 +2546,25 @@ class Game:
         # Set initial positions for party members higher up the grid
         for i, member in enumerate(self.party):
             member.position = GridPosition(i + 1, GRID_ROWS - 5)
+        self._all_chars_cache = None
+        self._occupancy_cache = None
+        self.move_cache.clear()
         
         # Create enemies for all waves but position them OFF-GRID initially
-        self.enemies = [
-            # Wave 1
-            Enemy("Goblin", hp=20, ac=15, attack_bonus=5),
-            Enemy("Goblin", hp=20, ac=15, attack_bonus=5),
-            Enemy("Goblin", hp=20, ac=15, attack_bonus=5),
-            # Wave 2
-            Enemy("Ogre", hp=40, ac=17, attack_bonus=7, damage_dice=(2, 6)),
-            Enemy("Ogre", hp=40, ac=17, attack_bonus=7, damage_dice=(2, 6)),
-            # Wave 3 (Boss)
-            Enemy("Wyvern", hp=55, ac=19, attack_bonus=9, damage_dice=(2, 8)),
-            Enemy("Wyvern", hp=55, ac=19, attack_bonus=9, damage_dice=(2, 8))
-        ]
+        self.enemies = [Enemy(*stats) for wave in WAVES for stats in wave.enemies]
         
         # Position all enemies OFF-GRID initially
         for enemy in self.enemies:
             enemy.position = GridPosition(-1, -1)  # Off-grid position
         
         self.wave_number = 0  # Explicitly set wave number to 0
-        self.state = "combat"
+        self.set_state("combat")
         self.start_battle()
 
     def start_battle(self):
         """Start a new battle or the next wave"""
-        if not any(m.is_alive() for m in self.party):
+        self.living_party = [member for member in self.party if member.is_alive()]
+        if not self.living_party:
             self.end_battle()
             return
             
@@ -2243,21 +2577,13 @@ class Game:
                 member.position = GridPosition(i + 1, GRID_ROWS - 5)
 
         # Determine number of enemies for the current wave
-        if self.wave_number == 1: # First wave (Goblins)
-            num_enemies_this_wave = 3
-            self.show_wave_announcement("Wave 1: Goblins")
-            positions = [(GRID_COLS - 4, 1), (GRID_COLS - 2, 1), (GRID_COLS - 1, 2)]
-        elif self.wave_number == 2: # Second wave (Ogres)
-            num_enemies_this_wave = 2
-            self.show_wave_announcement("Wave 2: Ogres' Fury")
-            positions = [(GRID_COLS - 3, 1), (GRID_COLS - 1, 1)]
-        elif self.wave_number == 3: # Third wave (Wyvern Boss)
-            num_enemies_this_wave = 2
-            self.show_wave_announcement("Wave 3: Wyvern Assault!")
-            positions = [(GRID_COLS - 3, 1), (GRID_COLS - 1, 2)]
-        else:
+        if self.wave_number > NUM_WAVES:
             self.end_battle(victory=True)
             return
+        wave = WAVES[self.wave_number - 1]
+        num_enemies_this_wave = len(wave.enemies)
+        self.show_wave_announcement(wave.announcement)
+        positions = wave.positions
 
         # Check if we have enough enemies for this wave
         if len(self.enemies) < num_enemies_this_wave:
@@ -2271,11 +2597,15 @@ class Game:
         # Position the enemies
         for i, enemy in enumerate(self.current_enemies):
             enemy.position = GridPosition(*positions[i])
+        self.living_enemies = list(self.current_enemies)
+        self._all_chars_cache = None
+        self._occupancy_cache = None
+        self.move_cache.clear()
         
         self.add_message(f"\n--- Wave {self.wave_number}: {len(self.current_enemies)} enemies appear! ---")
         self.current_member_idx = 0
         self.actions_left = 3
-        self.state = "combat"
+        self.set_state("combat")
         self.update_available_actions()
 
     def next_turn(self):
@@ -2283,7 +2613,7 @@ class Game:
         # Clear any selections
         self.selected_character = None
         self.selected_target = None
-        self.highlighted_squares = []
+        self.highlighted_squares = set()
         
         # Clear movement confirmation state
         self.selected_movement_square = None
@@ -2301,9 +2631,8 @@ class Game:
         
         if self.current_member_idx >= len(self.party):
             # Enemy's turn - start with first alive enemy
-            alive_enemies = [enemy for enemy in self.current_enemies if enemy.is_alive()]
-            if alive_enemies:
-                self.current_enemy = alive_enemies[0]
+            if self.living_enemies:
+                self.current_enemy = self.living_enemies[0]
                 self.current_enemy_idx = 0
                 self.handle_enemy_turn(self.current_enemy)
             else:
@@ -2381,14 +2710,11 @@ class Game:
         enemy = self.current_enemy
         
         # Find closest living party member
-        targets = [(char, enemy.position.distance_to(char.position))
-                  for char in self.party if char.is_alive()]
-        if not targets:
+        target, distance = enemy.nearest(self.living_party)
+        if target is None:
             # No valid targets, end turn
             self.next_enemy_turn()
             return
-            
-        target, distance = min(targets, key=lambda x: x[1])
         
         action_performed = False
         
@@ -2401,8 +2727,9 @@ class Game:
             # Move towards target
             moves = enemy.get_valid_moves(self)
             if moves:
-                best_move = min(moves, 
-                              key=lambda pos: pos.distance_to(target.position))
+                # Closest square to the target (same metric as distance_to, inlined)
+                tx, ty = target.position.x, target.position.y
+                best_move = min(moves, key=lambda pos: max(abs(pos.x - tx), abs(pos.y - ty)))
                 if enemy.move_to(best_move, self):
                     self.enemy_actions_remaining -= 1
                     action_performed = True
@@ -2422,12 +2749,11 @@ class Game:
 
     def next_enemy_turn(self):
         """Move to the next enemy or end enemy phase"""
-        alive_enemies = [enemy for enemy in self.current_enemies if enemy.is_alive()]
         self.current_enemy_idx += 1
         
-        if self.current_enemy_idx < len(alive_enemies):
+        if self.current_enemy_idx < len(self.living_enemies):
             # Move to next enemy
-            self.current_enemy = alive_enemies[self.current_enemy_idx]
+            self.current_enemy = self.living_enemies[self.current_enemy_idx]
             self.handle_enemy_turn(self.current_enemy)
         else:
             # All enemies have acted, end enemy phase
@@ -2448,7 +2774,7 @@ class Game:
                         self.add_message(f"{char.name} lowers their shield")
             
             # Check if battle is over
-            if not any(char.is_alive() for char in self.party):
+            if not self.living_party:
                 self.end_battle()
                 return
             
@@ -2462,10 +2788,10 @@ class Game:
             # Stop music before showing victory screen
             self.stop_music()
             self.add_message("\n🏆 Congratulations! Your party has defeated all foes!")
-            self.state = "victory"
+            self.set_state("victory")
         else:
             self.add_message("\n💀 Game Over - Your party was defeated...")
-            self.state = "game_over"
+            self.set_state("game_over")
         
         self.available_actions = [
             ("Restart", GridPosition(4, 3), self.init_game),
@@ -2475,50 +2801,29 @@ class Game:
     
     def draw_grid(self):
         """Draw the combat grid"""
-        # Draw background image if available, otherwise use solid color
-        if self.background_image:
-            self.grid_surface.blit(self.background_image, (0, 0))
-        else:
-            self.grid_surface.fill(BACKGROUND_COLOR)
-        
-        # Draw grid lines with some transparency so background shows through
-        grid_line_color = (80, 80, 80, 128)  # Semi-transparent gray
-        
-        # Create a temporary surface for grid lines with alpha
-        grid_lines_surface = pygame.Surface((GRID_COLS * GRID_SIZE, GRID_ROWS * GRID_SIZE), pygame.SRCALPHA)
-        
-        for x in range(GRID_COLS + 1):
-            pygame.draw.line(grid_lines_surface, grid_line_color,
-                           (x * GRID_SIZE, 0),
-                           (x * GRID_SIZE, GRID_ROWS * GRID_SIZE))
+        # Local names for what the loops below use on every frame
+        grid_surface = self.grid_surface
+        blit = grid_surface.blit
         
-        for y in range(GRID_ROWS + 1):
-            pygame.draw.line(grid_lines_surface, grid_line_color,
-                           (0, y * GRID_SIZE),
-                           (GRID_COLS * GRID_SIZE, y * GRID_SIZE))
-        
-        # Blit the grid lines onto the grid surface
-        self.grid_surface.blit(grid_lines_surface, (0, 0))
+        # Start from the pre-composed floor and grid lines
+        blit(self.grid_background, (0, 0))
         
         # Highlight valid moves
         for pos in self.highlighted_squares:
-            # Create a semi-transparent highlight
-            highlight_surface = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            highlight_surface.fill((120, 120, 120, 100))  # Semi-transparent highlight
-            self.grid_surface.blit(highlight_surface, (pos.x * GRID_SIZE, pos.y * GRID_SIZE))
+            blit(_MOVE_HIGHLIGHT_SURFACE, pos.get_pixel_pos())
         
         # Draw blue square around selected movement square
         if self.selected_movement_square and self.blue_square_image:
             pos = self.selected_movement_square
-            self.grid_surface.blit(self.blue_square_image, (pos.x * GRID_SIZE, pos.y * GRID_SIZE))
+            grid_surface.blit(self.blue_square_image, pos.get_pixel_pos())
         
         # Draw characters
         for char in self.party:
-            char.draw(self.grid_surface, self)
+            char.draw(grid_surface, self)
             
         # Draw all current enemies
         for enemy in self.current_enemies:
-            enemy.draw(self.grid_surface, self)
+            enemy.draw(grid_surface, self)
         
         # Draw range indicators and valid targets
         if self.selected_character:
@@ -2526,39 +2831,38 @@ class Game:
             center = (x + GRID_SIZE//2, y + GRID_SIZE//2)
             
             # Draw character selection circle
-            pygame.draw.circle(self.grid_surface, (255, 255, 255),
+            pygame.draw.circle(grid_surface, (255, 255, 255),
                              center, GRID_SIZE//2, 1)
             
             # Draw spell ranges for wizard
             if isinstance(self.selected_character, Wizard):
                 # Arcane Blast range (red circle)
                 arcane_radius = self.selected_character.ARCANE_BLAST_RANGE * GRID_SIZE
-                pygame.draw.circle(self.grid_surface, (255, 50, 50),
+                pygame.draw.circle(grid_surface, (255, 50, 50),
                                  center, arcane_radius, 1)
                 
                 # Magic Missile range (blue circle)
                 missile_radius = self.selected_character.MAGIC_MISSILE_RANGE * GRID_SIZE
-                pygame.draw.circle(self.grid_surface, (50, 50, 255),
+                pygame.draw.circle(grid_surface, (50, 50, 255),
                                  center, missile_radius, 1)
                 
                 # Highlight enemies in range
                 for enemy in self.current_enemies:
                     if enemy.is_alive():
                         distance = self.selected_character.position.distance_to(enemy.position)
-                        ex, ey = enemy.position.get_pixel_pos()
                         if distance <= self.selected_character.ARCANE_BLAST_RANGE:
                             # Red highlight for Arcane Blast range
-                            pygame.draw.rect(self.grid_surface, (255, 100, 100),
-                                          (ex, ey, GRID_SIZE, GRID_SIZE), 2)
+                            pygame.draw.rect(grid_surface, (255, 100, 100),
+                                          enemy.position.get_rect(), 2)
                         elif distance <= self.selected_character.MAGIC_MISSILE_RANGE:
                             # Blue highlight for Magic Missile range
-                            pygame.draw.rect(self.grid_surface, (100, 100, 255),
-                                          (ex, ey, GRID_SIZE, GRID_SIZE), 2)
+                            pygame.draw.rect(grid_surface, (100, 100, 255),
+                                          enemy.position.get_rect(), 2)
             
             # Draw melee range for Fighter and Rogue
             elif isinstance(self.selected_character, (Fighter, Rogue)):
                 radius = GRID_SIZE  # 1 square range
-                pygame.draw.circle(self.grid_surface, (255, 255, 255),
+                pygame.draw.circle(grid_surface, (255, 255, 255),
                                  center, radius, 1)
                 
                 # Highlight enemies in melee range
@@ -2566,21 +2870,18 @@ class Game:
                     if enemy.is_alive():
                         distance = self.selected_character.position.distance_to(enemy.position)
                         if distance <= 1:
-                            ex, ey = enemy.position.get_pixel_pos()
-                            pygame.draw.rect(self.grid_surface, (255, 255, 255),
-                                          (ex, ey, GRID_SIZE, GRID_SIZE), 2)
+                            pygame.draw.rect(grid_surface, (255, 255, 255),
+                                          enemy.position.get_rect(), 2)
         
         # Highlight valid targets for pending action
         for target in self.valid_targets:
-            x, y = target.position.get_rect().center
-            pygame.draw.rect(self.grid_surface, (255, 255, 0),  # Yellow highlight
-                           (x - GRID_SIZE//2, y - GRID_SIZE//2, GRID_SIZE, GRID_SIZE), 2)
+            pygame.draw.rect(grid_surface, (255, 255, 0),  # Yellow highlight
+                           target.position.get_rect(), 2)
     
     def draw_messages(self):
         """Draw the message log with scrolling"""
         # Draw a clear, visible message log box above the action buttons
-        log_height = 220
-        self.message_surface = pygame.Surface((WINDOW_WIDTH - 40, log_height))
+        log_height = MESSAGE_LOG_HEIGHT
         self.message_surface.fill((20, 20, 20))  # Dark background for contrast
         pygame.draw.rect(self.message_surface, (255, 200, 100), self.message_surface.get_rect(), 2)  # Golden border
 
@@ -2594,10 +2895,14 @@ class Game:
 
         # Draw visible messages
         y = 25
-        visible_messages = self.messages[self.message_scroll:self.message_scroll + 8]
-        for message in visible_messages:
-            text = FONT.render(message, True, TEXT_COLOR)
-            self.message_surface.blit(text, (5, y))
+        visible_messages = itertools.islice(self.messages, self.message_scroll, self.message_scroll + 8)
+        blit = self.message_surface.blit
+        for entry in visible_messages:
+            # Lines are only rendered once they scroll into view, then reused every frame
+            text = entry[1]
+            if text is None:
+                text = entry[1] = FONT.render(entry[0], True, TEXT_COLOR)
+            blit(text, (5, y))
             y += 25
     
     def draw_turn_indicator(self):
@@ -2607,7 +2912,7 @@ class Game:
     def draw_turn_indicator_at_offset(self, offset_x: int, offset_y: int):
         """Draw the turn indicator with position offset"""
         if self.state == "combat":
-            indicator_surface = pygame.Surface((200, 40))
+            indicator_surface = self.indicator_surface
             indicator_surface.fill(BACKGROUND_COLOR)
             
             if self.current_member_idx < len(self.party):
@@ -2616,7 +2921,7 @@ class Game:
                 text = f"{current.name}'s Turn"
                 # Draw action points for party members
                 action_text = f"Actions: {self.actions_left}"
-                action_surf = FONT.render(action_text, True, TEXT_COLOR)
+                action_surf = self.render_button_text(action_text)
                 self.screen.blit(action_surf, (offset_x + 220, offset_y + 10))
             else:
                 # Enemy turn
@@ -2625,7 +2930,7 @@ class Game:
                     text = f"{self.current_enemy.name}'s Turn"
                     # Draw action points for current enemy
                     action_text = f"Actions: {self.enemy_actions_remaining}"
-                    action_surf = FONT.render(action_text, True, TEXT_COLOR)
+                    action_surf = self.render_button_text(action_text)
                     self.screen.blit(action_surf, (offset_x + 220, offset_y + 10))
                 else:
                     color = ENEMY_COLOR
@@ -2635,7 +2940,7 @@ class Game:
             pygame.draw.rect(indicator_surface, color, indicator_surface.get_rect(), 2)
             
             # Draw text
-            text_surf = FONT.render(text, True, TEXT_COLOR)
+            text_surf = self.render_button_text(text)
             text_rect = text_surf.get_rect(center=indicator_surface.get_rect().center)
             indicator_surface.blit(text_surf, text_rect)
             
@@ -2648,8 +2953,54 @@ class Game:
         elif event.button == 5:  # Mouse wheel down
             self.message_scroll = min(len(self.messages) - 8, self.message_scroll + 1)
     
+    # Name of the method that draws each full-screen state; any other state uses draw_combat_view
+    _SCREEN_DRAWERS = {
+        "intro": "draw_intro_screen",
+        "upgrade": "draw_upgrade_screen",
+        "wave_confirmation": "draw_wave_confirmation_screen",
+        "victory": "draw_end_game_screen",
+        "game_over": "draw_end_game_screen",
+    }
+
+    def set_state(self, state: str):
+        """Switch to state and resolve the method that draws it, so draw() doesn't dispatch every frame"""
+        self.state = state
+        self._draw_screen = getattr(self, self._SCREEN_DRAWERS.get(state, "draw_combat_view"))
+
+    def draw_combat_view(self):
+        """Draw the turn indicator, grid, message log, action buttons and effects (combat and class select)"""
+        screen_width, screen_height = self.screen.get_size()
+        offset_x = max(0, (screen_width - WINDOW_WIDTH) // 2)
+        offset_y = max(0, (screen_height - WINDOW_HEIGHT) // 2)
+
+        # Draw turn indicator
+        self.draw_turn_indicator_at_offset(offset_x, offset_y)
+
+        # Render the combat grid, message log and action buttons to their own surfaces
+        self.draw_grid()
+        self.draw_messages()
+        self.draw_action_buttons()
+
+        # Blit all panels in a single call (order matters: the log sits on top of the grid)
+        self.screen.blits((
+            (self.grid_surface, (offset_x, offset_y + GRID_TOP)),
+            (self.message_surface, (offset_x + 20, offset_y + WINDOW_HEIGHT - 320)),  # Place above action buttons
+            (self.action_surface, (offset_x, offset_y + WINDOW_HEIGHT - 100))
+        ), doreturn=False)
+
+        # Draw all active effects (need to offset these too); effects still in their
+        # start delay draw nothing, so skip the offset bookkeeping for them
+        for effect in self.effects:
+            if effect.current_frame >= 0:
+                effect.draw_with_offset(self.screen, offset_x, offset_y + GRID_TOP)
+    
     def draw(self):
-        """Draw the game screen"""
+        """Draw the game screen and present it; this is the only place the display is updated"""
+        # Check for overlapping characters at most once per frame, and only after a move
+        if DEBUG and self._positions_dirty:
+            self.check_for_overlap()
+            self._positions_dirty = False
+        
         self.screen.fill(BACKGROUND_COLOR)
         
         # Calculate centering offsets for fullscreen mode
@@ -2657,33 +3008,8 @@ class Game:
         offset_x = max(0, (screen_width - WINDOW_WIDTH) // 2)
         offset_y = max(0, (screen_height - WINDOW_HEIGHT) // 2)
 
-        if self.state == "intro":
-            self.draw_intro_screen()
-        elif self.state == "upgrade":
-            self.draw_upgrade_screen()
-        elif self.state == "wave_confirmation":
-            self.draw_wave_confirmation_screen()
-        elif self.state == "victory" or self.state == "game_over":
-            self.draw_end_game_screen()
-        else:  # Combat or Class Select
-            # Draw combat grid
-            self.draw_grid()
-            self.screen.blit(self.grid_surface, (offset_x, offset_y + GRID_TOP))
-
-            # Draw turn indicator
-            self.draw_turn_indicator_at_offset(offset_x, offset_y)
-
-            # Draw message log (now always visible and clear)
-            self.draw_messages()
-            self.screen.blit(self.message_surface, (offset_x + 20, offset_y + WINDOW_HEIGHT - 320))  # Place above action buttons
-
-            # Draw action buttons
-            self.draw_action_buttons()
-            self.screen.blit(self.action_surface, (offset_x, offset_y + WINDOW_HEIGHT - 100))
-
-            # Draw all active effects (need to offset these too)
-            for effect in self.effects:
-                effect.draw_with_offset(self.screen, offset_x, offset_y + GRID_TOP)
+        # The drawer for the current state was looked up when the state was set
+        self._draw_screen()
 
         # Draw wave announcement overlay
         self.draw_wave_announcement()
@@ -2707,32 +3033,44 @@ class Game:
         # Draw fullscreen indicator in corner
         if self.is_fullscreen:
             indicator_text = FONT.render("Fullscreen (F11/F/ESC to toggle)", True, (150, 150, 150))
-            self.screen.blit(indicator_text, (10, screen_height - 25))
+            self._dirty_rects.append(self.screen.blit(indicator_text, (10, screen_height - 25)))
 
-        pygame.display.flip()
+        # Static UI screens only push the regions drawn this frame and the last one
+        # (so anything no longer drawn gets cleared); combat and state changes flip the whole window
+        if self.state in STATIC_UI_STATES and self.state == self._presented_state:
+            pygame.display.update(self._prev_dirty_rects + self._dirty_rects)
+        else:
+            pygame.display.flip()
+        self._presented_state = self.state
+        self._screen_dirty = False
+        self._prev_dirty_rects = self._dirty_rects
+        self._dirty_rects = []
 
     def draw_end_game_screen(self):
-        """Draw the game over or victory screen"""
-        # Fill background
-        self.screen.fill(BACKGROUND_COLOR)
-
+        """Draw the game over or victory screen (draw() has already cleared the window)"""
         # Draw title
-        if self.state == "victory":
-            title_text = "🏆 Congratulations! You are Victorious! 🏆"
-            subtitle_text = "You have defeated all waves of enemies!"
-        else:  # game_over
-            title_text = "💀 Game Over 💀"
-            subtitle_text = "Your party has fallen in battle..."
+        text = self._end_screen_text.get(self.state)
+        if text is None:
+            if self.state == "victory":
+                title_text = "🏆 Congratulations! You are Victorious! 🏆"
+                subtitle_text = "You have defeated all waves of enemies!"
+            else:  # game_over
+                title_text = "💀 Game Over 💀"
+                subtitle_text = "Your party has fallen in battle..."
+            text = self._end_screen_text[self.state] = (
+                LARGE_TITLE_FONT.render(title_text, True, TITLE_COLOR),
+                TITLE_FONT.render(subtitle_text, True, TEXT_COLOR),
+                TITLE_FONT.render("Play Again", True, TEXT_COLOR),
+                TITLE_FONT.render("Quit Game", True, TEXT_COLOR))
+        title, subtitle, restart_text, quit_text = text
 
         # Draw main title
-        title = LARGE_TITLE_FONT.render(title_text, True, TITLE_COLOR)
         title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3))
-        self.screen.blit(title, title_rect)
+        self._dirty_rects.append(self.screen.blit(title, title_rect))
 
         # Draw subtitle
-        subtitle = TITLE_FONT.render(subtitle_text, True, TEXT_COLOR)
         subtitle_rect = subtitle.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3 + 60))
-        self.screen.blit(subtitle, subtitle_rect)
+        self._dirty_rects.append(self.screen.blit(subtitle, subtitle_rect))
 
         # Draw buttons
         button_width = 200
@@ -2746,7 +3084,6 @@ class Game:
         restart_rect = pygame.Rect(start_x, button_y, button_width, button_height)
         pygame.draw.rect(self.screen, BUTTON_COLOR, restart_rect)
         pygame.draw.rect(self.screen, TITLE_COLOR, restart_rect, 2)
-        restart_text = TITLE_FONT.render("Play Again", True, TEXT_COLOR)
         text_rect = restart_text.get_rect(center=restart_rect.center)
         self.screen.blit(restart_text, text_rect)
 
@@ -2754,9 +3091,9 @@ class Game:
         quit_rect = pygame.Rect(start_x + button_width + margin, button_y, button_width, button_height)
         pygame.draw.rect(self.screen, BUTTON_COLOR, quit_rect)
         pygame.draw.rect(self.screen, TITLE_COLOR, quit_rect, 2)
-        quit_text = TITLE_FONT.render("Quit Game", True, TEXT_COLOR)
         text_rect = quit_text.get_rect(center=quit_rect.center)
         self.screen.blit(quit_text, text_rect)
+        self._dirty_rects.extend((restart_rect, quit_rect))
 
         # Store buttons for click handling
         self.action_buttons = [
@@ -2770,9 +3107,22 @@ class Game:
         while running:
             current_time = pygame.time.get_ticks()
             
+            # Static screens have nothing to animate, so sleep until input arrives
+            # (the timeout keeps the loop ticking) instead of spinning at 60 FPS
+            idle = (self.state in STATIC_UI_STATES and not self.effects and
+                    not self.victory_overlay_active and self.action_delay <= current_time)
+
             # Always process pygame events first to keep window responsive
             try:
-                for event in pygame.event.get():
+                if idle:
+                    events = [pygame.event.wait(100)]
+                    events.extend(pygame.event.get())
+                    # A bare timeout leaves the static screen exactly as it was
+                    if events[0].type != pygame.NOEVENT or len(events) > 1:
+                        self._screen_dirty = True
+                else:
+                    events = pygame.event.get()
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                         self.quit_game()
@@ -2788,8 +3138,7 @@ class Game:
                         if event.type == pygame.MOUSEBUTTONDOWN:
                             if event.button in (4, 5): 
                                 mouse_pos = pygame.mouse.get_pos()
-                                message_area = pygame.Rect(20, WINDOW_HEIGHT - 300, WINDOW_WIDTH - 40, 200)
-                                if message_area.collidepoint(mouse_pos):
+                                if self._message_area_rect.collidepoint(mouse_pos):
                                     self.handle_scroll(event)
                             elif event.button == 1: 
                                 self.handle_click(event.pos)
@@ -2804,7 +3153,7 @@ class Game:
                 if current_time - self.victory_overlay_start >= self.victory_overlay_duration:
                     self.victory_overlay_active = False
                     # Proceed to next phase after victory overlay
-                    if self.wave_number == 3:  # Final wave completed
+                    if self.wave_number == NUM_WAVES:  # Final wave completed
                         self.end_battle(victory=True)
                     else:  # Wave 1 or 2 completed
                         self.start_upgrades()
@@ -2822,7 +3171,7 @@ class Game:
                 continue
             
             # Check if we need to perform the next AI action after delay
-            if hasattr(self, '_schedule_next_ai_action') and self._schedule_next_ai_action:
+            if self._schedule_next_ai_action:
                 self._schedule_next_ai_action = False
                 self.perform_next_ai_action()
                 # Continue to draw after scheduling AI action
@@ -2832,7 +3181,7 @@ class Game:
                 continue
             
             # Check if we need to perform the next enemy action after delay
-            if hasattr(self, '_schedule_next_enemy_action') and self._schedule_next_enemy_action:
+            if self._schedule_next_enemy_action:
                 self._schedule_next_enemy_action = False
                 self.perform_next_enemy_action()
                 # Continue to draw after scheduling enemy action
@@ -2842,61 +3191,66 @@ class Game:
                 continue
             
             # If turn should end after delay, do it now
-            if hasattr(self, '_end_turn_after_delay') and self._end_turn_after_delay:
+            if self._end_turn_after_delay:
                 self._end_turn_after_delay = False
                 self.next_turn()
             
             # Update effects
             self.update_effects()
             
-            self.draw()
+            # An idle static screen is only redrawn after input or a state change
+            if not idle or self._screen_dirty or self.state != self._presented_state:
+                self.draw()
             self.clock.tick(60)
 
+    def _targets_within(self, char: 'Character', candidates: List['Character'], max_range: int) -> List['Character']:
+        """Living characters from candidates within max_range squares of char"""
+        px, py = char.position.x, char.position.y
+        return [other for other in candidates
+                if other.is_alive() and max(abs(other.position.x - px), abs(other.position.y - py)) <= max_range]
+
+    def _wizard_targets(self, wizard: 'Wizard', action_id: 'ActionID') -> List['Character']:
+        """Valid targets for a Wizard spell"""
+        if action_id == ActionID.ARCANE_BLAST:
+            return self._targets_within(wizard, self.current_enemies, wizard.ARCANE_BLAST_RANGE)
+        elif action_id == ActionID.MAGIC_MISSILE:
+            return self._targets_within(wizard, self.current_enemies, wizard.MAGIC_MISSILE_RANGE)
+        return []
+
+    def _cleric_targets(self, cleric: 'Cleric', action_id: 'ActionID') -> List['Character']:
+        """Valid targets for a Cleric strike or spell"""
+        if action_id == ActionID.STRIKE:
+            return self._targets_within(cleric, self.current_enemies, 1)
+        ally_range = cleric.ALLY_SPELL_RANGES.get(action_id)
+        if ally_range is None:
+            return []
+        return self._targets_within(cleric, self.party, ally_range)
+
+    def _melee_targets(self, char: 'Character', action_id: 'ActionID') -> List['Character']:
+        """Valid targets for a basic melee attack"""
+        return self._targets_within(char, self.current_enemies, 1)
+
+    # Target resolver for each playable class, looked up by exact type
+    _TARGET_RESOLVERS = {
+        Wizard: _wizard_targets,
+        Cleric: _cleric_targets,
+        Fighter: _melee_targets,
+        Rogue: _melee_targets,
+    }
+
     def get_valid_targets(self) -> List['Character']:
         """Get valid targets for the current action"""
-        if not self.pending_action or not isinstance(self.pending_action[1], tuple):
+        # pending_action is (action_id, bound action) while a target is being chosen
+        if not self.pending_action or self.current_member_idx >= len(self.party):
             return []
             
-        action_name = self.pending_action[0]
+        action_id = self.pending_action[0]
         current_char = self.party[self.current_member_idx]
         
-        if isinstance(current_char, Wizard):
-            if "Arcane Blast" in action_name:
-                return [enemy for enemy in self.current_enemies 
-                       if enemy.is_alive() and 
-                       current_char.position.distance_to(enemy.position) <= current_char.ARCANE_BLAST_RANGE]
-            elif "Magic Missile" in action_name:
-                return [enemy for enemy in self.current_enemies 
-                       if enemy.is_alive() and 
-                       current_char.position.distance_to(enemy.position) <= current_char.MAGIC_MISSILE_RANGE]
-        elif isinstance(current_char, Cleric):
-            if "Strike" in action_name:
-                return [enemy for enemy in self.current_enemies
-                       if enemy.is_alive() and
-                       current_char.position.distance_to(enemy.position) <= 1]
-            elif "Spirit Link" in action_name:
-                return [ally for ally in self.party 
-                       if ally.is_alive() and 
-                       current_char.position.distance_to(ally.position) <= current_char.SPIRIT_LINK_RANGE]
-            elif "Sanctuary" in action_name:
-                return [ally for ally in self.party 
-                       if ally.is_alive() and 
-                       current_char.position.distance_to(ally.position) <= current_char.SANCTUARY_RANGE]
-            elif "Lesser Heal" in action_name:
-                if "1" in action_name:  # Touch range
-                    return [ally for ally in self.party 
-                           if ally.is_alive() and 
-                           current_char.position.distance_to(ally.position) <= current_char.LESSER_HEAL_RANGE]
-                else:  # 30-foot range
-                    return [ally for ally in self.party 
-                           if ally.is_alive() and 
-                           current_char.position.distance_to(ally.position) <= current_char.LESSER_HEAL_UP_RANGE]
-        elif isinstance(current_char, (Fighter, Rogue)): # Basic melee targeting for now
-             return [enemy for enemy in self.current_enemies
-                   if enemy.is_alive() and
-                   current_char.position.distance_to(enemy.position) <= 1]
-        
-        return []
+        resolver = self._TARGET_RESOLVERS.get(type(current_char))
+        if resolver is None:
+            return []
+        return resolver(self, current_char, action_id)
 
     def perform_action(self, action_func, target=None):
         """Perform an action with delay"""
@@ -2925,7 +3279,7 @@ class Game:
                  pass # Do nothing specific here, Stride is handled on move click
         
         # Only update available actions if actions_left > 0 or turn is not scheduled to end
-        if self.actions_left > 0 or not (hasattr(self, '_end_turn_after_delay') and self._end_turn_after_delay):
+        if self.actions_left > 0 or not self._end_turn_after_delay:
             self.update_available_actions() # Always update actions after an attempt
         return result
 
@@ -2940,7 +3294,7 @@ class Game:
             
             # Clear movement selection state
             self.selected_character = None
-            self.highlighted_squares = []
+            self.highlighted_squares = set()
             self.selected_movement_square = None
             self.movement_confirmation_mode = False
             
@@ -2963,21 +3317,29 @@ class Game:
 
     def start_game(self):
         """Transition from intro to class selection"""
-        self.state = "class_select"
-        self.messages = ["Choose your class:"]
+        self.set_state("class_select")
+        self.messages = deque([["Choose your class:", None]], MESSAGE_LOG_LIMIT)
         self.update_available_actions()
 
     def draw_intro_screen(self):
         """Draw the introduction screen with improved spacing and centering"""
-        self.screen.fill(BACKGROUND_COLOR)
-        
+        # The text never changes, so it is rendered and laid out only once
+        if self._intro_blits is None:
+            self._intro_blits = self._layout_intro_text()
+        self._dirty_rects.extend(self.screen.blits(self._intro_blits))
+        self.draw_action_buttons() # This will draw the single "Start Game" button
+        self._dirty_rects.append(self.screen.blit(self.action_surface, (0, WINDOW_HEIGHT - 100)))
+
+    def _layout_intro_text(self) -> List[Tuple[pygame.Surface, Union[pygame.Rect, Tuple[int, int]]]]:
+        """Render the intro screen text, returned as (surface, position) pairs for Surface.blits"""
+        blits = []
         title = LARGE_TITLE_FONT.render("PF2E Grid Combat Simulator", True, TITLE_COLOR)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, 60))
-        self.screen.blit(title, title_rect)
+        blits.append((title, title_rect))
         
         subtitle = TITLE_FONT.render("By: Runtime Terrors", True, TEXT_COLOR)
         subtitle_rect = subtitle.get_rect(center=(WINDOW_WIDTH//2, 100))
-        self.screen.blit(subtitle, subtitle_rect)
+        blits.append((subtitle, subtitle_rect))
         
         # Intro content as (text, type) tuples for better spacing
         intro_content = [
@@ -3013,40 +3375,38 @@ class Game:
         for text, typ in intro_content:
             if typ == "header":
                 surf = TITLE_FONT.render(text, True, TITLE_COLOR)
-                self.screen.blit(surf, (x_left, y))
+                blits.append((surf, (x_left, y)))
                 y += 38
             elif typ == "paragraph":
-                # Wrap paragraph text
+                # Wrap paragraph text (measure with FONT.size so only finished lines get rasterized)
                 words = text.split()
                 line = ""
                 for word in words:
                     test_line = line + word + " "
-                    test_surf = FONT.render(test_line, True, TEXT_COLOR)
-                    if test_surf.get_width() > block_width:
+                    if FONT.size(test_line)[0] > block_width:
                         surf = FONT.render(line, True, TEXT_COLOR)
-                        self.screen.blit(surf, (x_left, y))
+                        blits.append((surf, (x_left, y)))
                         y += 26
                         line = word + " "
                     else:
                         line = test_line
                 if line:
                     surf = FONT.render(line, True, TEXT_COLOR)
-                    self.screen.blit(surf, (x_left, y))
+                    blits.append((surf, (x_left, y)))
                     y += 32
             elif typ == "section_header":
                 surf = TITLE_FONT.render(text, True, TITLE_COLOR)
-                self.screen.blit(surf, (x_left, y))
+                blits.append((surf, (x_left, y)))
                 y += 34
             elif typ == "bullet":
                 surf = FONT.render("• " + text, True, TEXT_COLOR)
-                self.screen.blit(surf, (x_left + 24, y))
+                blits.append((surf, (x_left + 24, y)))
                 y += 26
             elif typ == "section_gap":
                 y += 24
             elif typ == "spacer":
                 y += 12
-        self.draw_action_buttons() # This will draw the single "Start Game" button
-        self.screen.blit(self.action_surface, (0, WINDOW_HEIGHT - 100))
+        return blits
 
     def show_wave_announcement(self, text):
         """Show wave announcement overlay"""
@@ -3060,10 +3420,7 @@ class Game:
             self.overlay_surface.fill((0, 0, 0, 0))
             
             # Add semi-transparent black background
-            overlay_bg = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-            overlay_bg.fill((0, 0, 0))
-            overlay_bg.set_alpha(180)
-            self.screen.blit(overlay_bg, (0, 0))
+            self._dirty_rects.append(self.screen.blit(self.overlay_bg, (0, 0)))
             
             # Draw the announcement text
             text = LARGE_TITLE_FONT.render(self.wave_announcement, True, TITLE_COLOR)
@@ -3075,10 +3432,7 @@ class Game:
     def draw_victory_overlay(self):
         """Draw the victory overlay when a wave is completed"""
         # Add semi-transparent black background
-        overlay_bg = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay_bg.fill((0, 0, 0))
-        overlay_bg.set_alpha(180)
-        self.screen.blit(overlay_bg, (0, 0))
+        self._dirty_rects.append(self.screen.blit(self.overlay_bg, (0, 0)))
         
         # Draw the victory text with golden color
         victory_text = "VICTORY!"
@@ -3098,7 +3452,7 @@ class Game:
         """Start the upgrade selection process"""
         # No healing between waves - healing only happens in combat
         
-        self.state = "upgrade"
+        self.set_state("upgrade")
         self.upgrade_selection = 0  # Start with first party member
         
         # Show upgrade instructions the first time
@@ -3114,20 +3468,21 @@ class Game:
             char = self.party[self.upgrade_selection]
             message = char.apply_upgrade(upgrade)
             self.add_message(message)
+            self._occupancy_cache = None  # Vitality can bring a fallen member back above 0 HP
+            self.move_cache.clear()  # and Speed changes how far anyone can move
             
             # Move to next character or to confirmation
             self.upgrade_selection += 1
             if self.upgrade_selection >= len(self.party):
-                self.show_wave_confirmation()
-            self.update_available_actions()
+                self.show_wave_confirmation()  # Refreshes the available actions itself
+            else:
+                self.update_available_actions()
 
     def check_wave_complete(self):
         """Check if current wave is complete and start upgrades or end game if so"""
         if self.state != "combat": return False # Only check during combat
 
-        alive_enemies = [e for e in self.current_enemies if e.is_alive()]
-        
-        if not alive_enemies:
+        if not self.living_enemies:
             # Immediately stop all actions and show victory overlay
             self.actions_left = 0
             self.action_delay = 0
@@ -3144,10 +3499,10 @@ class Game:
             self.victory_overlay_active = True
             self.victory_overlay_start = pygame.time.get_ticks()
             
-            if self.wave_number == 3: # Just completed the final wave (Wyvern)
+            if self.wave_number == NUM_WAVES: # Just completed the final wave (Wyvern)
                 # For final victory, we'll handle this in the victory overlay logic
                 pass
-            elif self.wave_number < 3: # Completed wave 1 or 2
+            elif self.wave_number < NUM_WAVES: # Completed wave 1 or 2
                 self.add_message("\nWave complete! Time to rest and upgrade!")
             else: # Should not be reached if logic is correct
                 pass
@@ -3164,7 +3519,7 @@ class Game:
         # Draw character name and stats
         title = LARGE_TITLE_FONT.render(f"Choose {char.name}'s Upgrade", True, TITLE_COLOR)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, 80))
-        self.screen.blit(title, title_rect)
+        self._dirty_rects.append(self.screen.blit(title, title_rect))
         
         # Draw current stats
         stats_text = [
@@ -3178,7 +3533,7 @@ class Game:
         y = 150
         for text in stats_text:
             surf = FONT.render(text, True, TEXT_COLOR)
-            self.screen.blit(surf, (WINDOW_WIDTH//4, y))
+            self._dirty_rects.append(self.screen.blit(surf, (WINDOW_WIDTH//4, y)))
             y += 30
         
         # Draw upgrade buttons
@@ -3194,21 +3549,20 @@ class Game:
             pygame.draw.rect(self.screen, BUTTON_COLOR, button_rect)
             pygame.draw.rect(self.screen, TITLE_COLOR, button_rect, 2)
             
-            text = FONT.render(upgrade, True, TEXT_COLOR)
+            text = self.render_button_text(upgrade)
             text_rect = text.get_rect(center=button_rect.center)
             self.screen.blit(text, text_rect)
+            self._dirty_rects.append(button_rect)
             
             self.action_buttons.append((button_rect, lambda u=upgrade: self.apply_upgrade(u)))
 
     def show_wave_confirmation(self):
         """Show confirmation screen after upgrades"""
-        self.state = "wave_confirmation"
+        self.set_state("wave_confirmation")
         
         # Determine next wave based on the wave *just completed* (which is current self.wave_number)
-        if self.wave_number == 1: # After Goblins (Wave 1)
-            next_wave_type = "Ogres (Wave 2)"
-        elif self.wave_number == 2: # After Ogres (Wave 2)
-            next_wave_type = "Wyvern Assault (Wave 3 Boss)"
+        if 1 <= self.wave_number < NUM_WAVES:
+            next_wave_type = WAVES[self.wave_number].preview
         else: 
             next_wave_type = "Error determining next wave"
 
@@ -3224,7 +3578,7 @@ class Game:
 
     def continue_to_next_wave(self):
         """Continue to the next wave"""
-        self.state = "combat"
+        self.set_state("combat")
         self.start_battle()
 
     def quit_game(self):
@@ -3240,22 +3594,22 @@ class Game:
         # Draw wave completion title
         title = LARGE_TITLE_FONT.render(self.wave_summary["completed"], True, TITLE_COLOR)
         title_rect = title.get_rect(center=(WINDOW_WIDTH//2, 80))
-        self.screen.blit(title, title_rect)
+        self._dirty_rects.append(self.screen.blit(title, title_rect))
 
         # Draw next wave info
         next_wave = TITLE_FONT.render(self.wave_summary["next"], True, TITLE_COLOR)
         next_rect = next_wave.get_rect(center=(WINDOW_WIDTH//2, 140))
-        self.screen.blit(next_wave, next_rect)
+        self._dirty_rects.append(self.screen.blit(next_wave, next_rect))
 
         # Draw party summary
         y = 200
         summary_title = TITLE_FONT.render("Party Status:", True, TITLE_COLOR)
-        self.screen.blit(summary_title, (WINDOW_WIDTH//4, y))
+        self._dirty_rects.append(self.screen.blit(summary_title, (WINDOW_WIDTH//4, y)))
         y += 40
 
         for status in self.wave_summary["upgrades"]:
             text = FONT.render(status, True, TEXT_COLOR)
-            self.screen.blit(text, (WINDOW_WIDTH//4, y))
+            self._dirty_rects.append(self.screen.blit(text, (WINDOW_WIDTH//4, y)))
             y += 30
 
         # Draw continue and quit buttons
@@ -3271,7 +3625,7 @@ class Game:
         pygame.draw.rect(self.screen, TITLE_COLOR, continue_rect, 2)
         
         # Use regular FONT instead of TITLE_FONT for button text
-        continue_text = FONT.render("Continue to Next Wave", True, TEXT_COLOR)
+        continue_text = self.render_button_text("Continue to Next Wave")
         text_rect = continue_text.get_rect(center=continue_rect.center)
         self.screen.blit(continue_text, text_rect)
 
@@ -3282,9 +3636,10 @@ class Game:
         pygame.draw.rect(self.screen, TITLE_COLOR, quit_rect, 2)
         
         # Use regular FONT for consistency
-        quit_text = FONT.render("Quit Game", True, TEXT_COLOR)
+        quit_text = self.render_button_text("Quit Game")
         text_rect = quit_text.get_rect(center=quit_rect.center)
         self.screen.blit(quit_text, text_rect)
+        self._dirty_rects.extend((continue_rect, quit_rect))
 
         # Store buttons for click handling
         self.action_buttons = [
@@ -3307,9 +3662,10 @@ class Game:
         pygame.draw.rect(self.screen, TITLE_COLOR, self.help_button_rect, 2)
         
         # Draw text
-        text = FONT.render("How to Play", True, TEXT_COLOR)
+        text = self.render_button_text("How to Play")
         text_rect = text.get_rect(center=self.help_button_rect.center)
         self.screen.blit(text, text_rect)
+        self._dirty_rects.append(self.help_button_rect)
 
     def draw_upgrade_help_button(self):
         """Draw the upgrade help button next to the How to Play button"""
@@ -3327,17 +3683,15 @@ class Game:
         pygame.draw.rect(self.screen, TITLE_COLOR, self.upgrade_help_button_rect, 2)
         
         # Draw text
-        text = FONT.render("Upgrade Help", True, TEXT_COLOR)
+        text = self.render_button_text("Upgrade Help")
         text_rect = text.get_rect(center=self.upgrade_help_button_rect.center)
         self.screen.blit(text, text_rect)
+        self._dirty_rects.append(self.upgrade_help_button_rect)
 
     def draw_help_overlay(self):
         """Draw the help overlay with game instructions (improved layout, more space)"""
         # Semi-transparent background
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(180)
-        self.screen.blit(overlay, (0, 0))
+        self._dirty_rects.append(self.screen.blit(self.overlay_bg, (0, 0)))
 
         # Help content (sections, headers, and bullets)
         help_sections = [
@@ -3415,6 +3769,9 @@ class Game:
             self.screen = pygame.display.set_mode(self.windowed_size)
             self.add_message("Switched to windowed mode (Press F11 or F to toggle)")
         
+        # The display surface was recreated, so the next frame must be presented in full
+        self._presented_state = None
+        
         # Update surfaces to match new screen size if needed
         current_width, current_height = self.screen.get_size()
         
@@ -3439,6 +3796,18 @@ class Game:
         # Start the first AI action
         self.perform_next_ai_action()
 
+    def check_for_overlap(self):
+        """
+        Log any living characters sharing a square.
+        Only called from draw() when DEBUG is enabled and someone moved, since the scan is O(N^2).
+        """
+        chars = [c for c in self.get_all_characters() if c.is_alive()]
+        for i in range(len(chars)):
+            for j in range(i+1, len(chars)):
+                if chars[i].position == chars[j].position:
+                    logging.warning(f"{chars[i].name} and {chars[j].name} overlap at "
+                                    f"({chars[i].position.x}, {chars[i].position.y})")
+
     def perform_next_ai_action(self):
         """Perform the next AI action with appropriate delay"""
         if not self.ai_current_char or not self.ai_current_char.is_alive() or self.ai_actions_remaining <= 0:
@@ -3448,197 +3817,8 @@ class Game:
             self.next_turn()
             return
         
-        char = self.ai_current_char
-        
-        def get_unoccupied_moves(character, target_pos):
-            """
-            Returns a list of valid, unoccupied positions a character can move to,
-            sorted by distance to the target position.
-
-            Parameters:
-            character (Character): The character attempting to move.
-            target_pos (Vector2): The position the character wants to approach.
-
-            Returns:
-            List[Vector2]: Sorted list of unoccupied positions.
-            """
-            all_moves = character.get_valid_moves(self) # Get all possible valid moves for the character
-            unoccupied = []
-            for pos in all_moves:
-                occupied = False
-                for other in self.get_all_characters():
-                    if other != character and other.position == pos and other.is_alive():
-                        occupied = True
-                        break
-                if not occupied:
-                    unoccupied.append(pos)
-            # Sort the available positions by proximity to the target
-            if unoccupied:
-                return sorted(unoccupied, key=lambda p: p.distance_to(target_pos))
-            return []
-        
-        def check_for_overlap():
-                
-                """
-                Checks for overlapping positions among alive characters.
-                This function currently does nothing if an overlap is detected.
-                """
-                chars = [c for c in self.get_all_characters() if c.is_alive()]
-                for i in range(len(chars)):
-                    for j in range(i+1, len(chars)):
-                        if chars[i].position == chars[j].position:
-                            pass  # Overlap detected but no debug message
-        
-        action_performed = False # Variable to track whether an action was successfully performed during AI's turn
-        
-        if isinstance(char, Fighter):# AI decision logic for a Fighter character
-            targets = [(enemy, char.position.distance_to(enemy.position))
-                      for enemy in self.current_enemies if enemy.is_alive()]
-            if targets:
-                target, distance = min(targets, key=lambda x: x[1])
-                if distance <= 1:# Close enough to attack
-                    if self.ai_actions_remaining >= 2:
-                        used, _ = char.power_attack(target, self)
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                    else:
-                        used, _ = char.attack(target, self, dice=(1, 10))
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                else:# Move closer if not adjacent
-                    moves = get_unoccupied_moves(char, target.position)
-                    if moves:
-                        best_move = moves[0]
-                        if char.move_to(best_move, self):
-                            check_for_overlap()
-                            self.ai_actions_remaining -= 1
-                            action_performed = True
-        
-        elif isinstance(char, Rogue):# Find all living enemy targets and calculate distance from the Rogue
-            targets = [(enemy, char.position.distance_to(enemy.position))
-                      for enemy in self.current_enemies if enemy.is_alive()]
-            if targets:
-                target, distance = min(targets, key=lambda x: x[1])
-                if distance <= 1:
-                    if char.is_flanking(target, self):
-                        used, _ = char.strike(target, self)
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                    elif self.ai_actions_remaining >= 2:
-                        used, _ = char.twin_feint(target, self)
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                    else:
-                        used, _ = char.strike(target, self)
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                else: # If not adjacent, try to move into flanking position
-                    moves = get_unoccupied_moves(char, target.position)
-                    if moves:
-                        best_move = None
-                        for move in moves:
-                            original_pos = char.position
-                            char.position = move
-                            if char.is_flanking(target, self):
-                                best_move = move
-                                char.position = original_pos
-                                break
-                            char.position = original_pos
-                        if not best_move:
-                            best_move = moves[0]
-                        if char.move_to(best_move, self):
-                            check_for_overlap()
-                            self.ai_actions_remaining -= 1
-                            action_performed = True
-        
-        elif isinstance(char, Cleric):
-            # First check if Cleric needs healing
-            if char.hp < char.max_hp:
-                missing_hp = char.max_hp - char.hp
-                allies_needing_heal = [(char, missing_hp)]
-            else:
-                allies_needing_heal = []
-            
-            # Then check other allies
-            allies_needing_heal.extend([
-                (ally, ally.max_hp - ally.hp) 
-                for ally in self.party 
-                if ally != char and ally.is_alive() and ally.hp < ally.max_hp
-            ])
-            
-            if allies_needing_heal:# Sort allies by the amount of HP they are missing (descending)
-                allies_needing_heal.sort(key=lambda x: x[1], reverse=True)
-                target_ally, missing_hp = allies_needing_heal[0]
-                distance = char.position.distance_to(target_ally.position)
-                if distance <= char.LESSER_HEAL_RANGE:
-                    used, _ = char.lesser_heal(target_ally, self, 1)
-                    self.ai_actions_remaining -= used
-                    action_performed = True
-                elif distance <= char.LESSER_HEAL_UP_RANGE:
-                    allies_in_range = sum(1 for ally, _ in allies_needing_heal 
-                                       if char.position.distance_to(ally.position) <= char.LESSER_HEAL_UP_RANGE)
-                    if allies_in_range >= 2 and self.ai_actions_remaining >= 3:
-                        used, _ = char.lesser_heal(target_ally, self, 3)
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                    elif self.ai_actions_remaining >= 2:
-                        used, _ = char.lesser_heal(target_ally, self, 2)
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                    else:
-                        moves = get_unoccupied_moves(char, target_ally.position)
-                        if moves:
-                            best_move = moves[0]
-                            if char.move_to(best_move, self):
-                                check_for_overlap()
-                                self.ai_actions_remaining -= 1
-                                action_performed = True
-                else:
-                    moves = get_unoccupied_moves(char, target_ally.position)
-                    if moves:
-                        best_move = moves[0]
-                        if char.move_to(best_move, self):
-                            check_for_overlap()
-                            self.ai_actions_remaining -= 1
-                            action_performed = True
-            else: # Find all living enemies and calculate distances
-                targets = [(enemy, char.position.distance_to(enemy.position))
-                          for enemy in self.current_enemies if enemy.is_alive()]
-                if targets:
-                    target, distance = min(targets, key=lambda x: x[1])
-                    if distance <= 1:
-                        used, _ = char.attack(target, self, dice=(1, 6))
-                        self.ai_actions_remaining -= used
-                        action_performed = True
-                    else:
-                        moves = get_unoccupied_moves(char, target.position)
-                        if moves:
-                            best_move = moves[0]
-                            if char.move_to(best_move, self):
-                                check_for_overlap()
-                                self.ai_actions_remaining -= 1
-                                action_performed = True
-        
-        elif isinstance(char, Wizard):
-            """
-            Handle wizard AI behavior - prioritize ranged magic attacks
-            """
-            targets = [(enemy, char.position.distance_to(enemy.position)) # Find all living enemies and calculate distances
-                      for enemy in self.current_enemies if enemy.is_alive()]
-            if targets:
-                target, distance = min(targets, key=lambda x: x[1])
-                if distance <= char.MAGIC_MISSILE_RANGE:
-                    used, _ = char.magic_missile(target, self, self.ai_actions_remaining)
-                    self.ai_actions_remaining -= used
-                    action_performed = True
-                else:
-                    moves = get_unoccupied_moves(char, target.position)
-                    if moves:
-                        best_move = moves[0]
-                        if char.move_to(best_move, self):
-                            check_for_overlap()
-                            self.ai_actions_remaining -= 1
-                            action_performed = True
+        # Each class decides its own move; False means it found nothing to do
+        action_performed = self.ai_current_char.plan_action(self)
         
         # If an action was performed, set a delay before the next action
         if action_performed:
@@ -3654,10 +3834,7 @@ class Game:
     def draw_upgrade_help_overlay(self):
         """Draw the upgrade help overlay with upgrade instructions"""
         # Semi-transparent background
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(180)
-        self.screen.blit(overlay, (0, 0))
+        self._dirty_rects.append(self.screen.blit(self.overlay_bg, (0, 0)))
 
         # Help content for upgrades
         upgrade_sections = [
@@ -3738,6 +3915,7 @@ class Game:
         except Exception as e:
             print(f"Error stopping music: {e}")
 
+
 if __name__ == "__main__":
     game = Game()
     game.run() 
\ No newline at end of file